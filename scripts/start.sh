@@ -157,11 +157,9 @@ preflight_checks() {
         fi
     done
     
-    # Check users.json
-    if [ ! -f "$DATA_DIR/users.json" ]; then
-        log_warning "users.json not found, creating default..."
-        echo '{"users": {}}' > "$DATA_DIR/users.json"
-        log_success "Created default users.json"
+    # User database (data/harmonix.db) is created with a default admin on first run
+    if [ ! -f "$DATA_DIR/harmonix.db" ]; then
+        log_info "User database not found, it will be created on first start"
     fi
     
     echo ""
@@ -8,12 +8,29 @@ import logging
 from pathlib import Path
 from typing import Optional, List, Dict, Union, Tuple
 from dataclasses import dataclass, field
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 import json
 import re
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps_json(data: Dict) -> str:
+    """Serialize to indented UTF-8 JSON, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
 @dataclass
 class LyricLine:
     """Single line of lyrics with timing"""
@@ -44,39 +61,282 @@ class LyricsResult:
     
     def to_lrc(self) -> str:
         """Convert to LRC format for karaoke"""
-        lines = []
-        for line in self.lines:
-            mins = int(line.start_time // 60)
-            secs = line.start_time % 60
-            lines.append(f"[{mins:02d}:{secs:05.2f}]{line.text}")
-        return '\n'.join(lines)
+        return self.render(['lrc'])['lrc']
     
     def to_srt(self) -> str:
         """Convert to SRT subtitle format"""
-        lines = []
-        for i, line in enumerate(self.lines, 1):
-            start = self._format_srt_time(line.start_time)
-            end = self._format_srt_time(line.end_time)
-            lines.append(f"{i}\n{start} --> {end}\n{line.text}\n")
-        return '\n'.join(lines)
-    
-    def _format_srt_time(self, seconds: float) -> str:
-        """Format time for SRT"""
-        hrs = int(seconds // 3600)
-        mins = int((seconds % 3600) // 60)
-        secs = seconds % 60
-        return f"{hrs:02d}:{mins:02d}:{secs:06.3f}".replace('.', ',')
+        return self.render(['srt'])['srt']
     
-    def to_dict(self) -> Dict:
+    @staticmethod
+    def _format_lrc_time(seconds: float) -> str:
+        """Format time for LRC (mm:ss.xx)"""
+        total_cs = int(round(seconds * 100))
+        mins, cs = divmod(total_cs, 6_000)
+        secs, cs = divmod(cs, 100)
+        return f"{mins:02d}:{secs:02d}.{cs:02d}"
+    
+    @staticmethod
+    def _format_srt_time(seconds: float) -> str:
+        """Format time for SRT (hh:mm:ss,mmm) using integer milliseconds"""
+        total_ms = int(round(seconds * 1000))
+        hrs, rem = divmod(total_ms, 3_600_000)
+        mins, rem = divmod(rem, 60_000)
+        secs, ms = divmod(rem, 1000)
+        return f"{hrs:02d}:{mins:02d}:{secs:02d},{ms:03d}"
+    
+    def render(self, formats: List[str]) -> Dict[str, str]:
+        """
+        Render several export formats in a single pass over the lines
+        
+        Args:
+            formats: Formats to render ('txt', 'lrc', 'srt', 'json')
+            
+        Returns:
+            Dictionary mapping format to file content (unknown formats skipped)
+        """
+        want_lrc = 'lrc' in formats
+        want_srt = 'srt' in formats
+        want_json = 'json' in formats
+        lrc_lines, srt_lines, json_lines = [], [], []
+        
+        if want_lrc or want_srt or want_json:
+            fmt_lrc = self._format_lrc_time
+            fmt_srt = self._format_srt_time
+            for i, line in enumerate(self.lines, 1):
+                if want_lrc:
+                    lrc_lines.append(f"[{fmt_lrc(line.start_time)}]{line.text}")
+                if want_srt:
+                    srt_lines.append(
+                        f"{i}\n{fmt_srt(line.start_time)} --> {fmt_srt(line.end_time)}\n{line.text}\n"
+                    )
+                if want_json:
+                    json_lines.append(line.to_dict())
+        
+        contents = {}
+        for fmt in formats:
+            if fmt == 'txt':
+                contents[fmt] = self.text
+            elif fmt == 'lrc':
+                contents[fmt] = '\n'.join(lrc_lines)
+            elif fmt == 'srt':
+                contents[fmt] = '\n'.join(srt_lines)
+            elif fmt == 'json':
+                contents[fmt] = _dumps_json(self.to_dict(lines=json_lines))
+        return contents
+    
+    def to_dict(self, lines: Optional[List[Dict]] = None) -> Dict:
         return {
             'text': self.text,
-            'lines': [line.to_dict() for line in self.lines],
+            'lines': lines if lines is not None else [line.to_dict() for line in self.lines],
             'language': self.language,
             'language_confidence': self.language_confidence,
             'duration': self.duration
         }
 
 
+def _group_words(words: List[Dict], max_gap: float = 1.0, max_words: int = 12) -> List[Dict]:
+    """
+    Group word timings into Whisper-style segments
+    
+    Backends that only report word timing when asked for it get their lines
+    back this way: a line ends at sentence punctuation, at a pause longer
+    than max_gap seconds, or after max_words words.
+    
+    Args:
+        words: Word dicts with 'word', 'start', 'end' (and 'probability')
+        max_gap: Pause in seconds that starts a new line
+        max_words: Maximum number of words per line
+        
+    Returns:
+        Segment dicts with 'text', 'start', 'end' and their 'words'
+    """
+    segments = []
+    current: List[Dict] = []
+    
+    def flush():
+        if current:
+            segments.append({
+                'text': ''.join(word['word'] for word in current),
+                'start': current[0]['start'],
+                'end': current[-1]['end'],
+                'words': list(current),
+            })
+            current.clear()
+    
+    for word in words:
+        if current and (word['start'] - current[-1]['end'] > max_gap or len(current) >= max_words):
+            flush()
+        current.append(word)
+        if word['word'].rstrip().endswith(('.', '!', '?')):
+            flush()
+    flush()
+    return segments
+
+
+class _WhisperCppBackend:
+    """
+    whisper.cpp (ggml) backend for quantized CPU inference
+    Exposes a Whisper-compatible transcribe() returning the same result dict
+    """
+    
+    # Quantized ggml models whisper.cpp publishes, per model size. There are
+    # no 4-bit Whisper models, so 'int4' loads the 5-bit one (q5_1 for the
+    # small sizes, q5_0 for the rest); large-v3 has no 8-bit build.
+    GGML_MODELS = {
+        'tiny': {'int8': 'tiny-q8_0', 'int4': 'tiny-q5_1'},
+        'tiny.en': {'int8': 'tiny.en-q8_0', 'int4': 'tiny.en-q5_1'},
+        'base': {'int8': 'base-q8_0', 'int4': 'base-q5_1'},
+        'base.en': {'int8': 'base.en-q8_0', 'int4': 'base.en-q5_1'},
+        'small': {'int8': 'small-q8_0', 'int4': 'small-q5_1'},
+        'small.en': {'int8': 'small.en-q8_0', 'int4': 'small.en-q5_1'},
+        'medium': {'int8': 'medium-q8_0', 'int4': 'medium-q5_0'},
+        'medium.en': {'int8': 'medium.en-q8_0', 'int4': 'medium.en-q5_0'},
+        'large-v2': {'int8': 'large-v2-q8_0', 'int4': 'large-v2-q5_0'},
+        'large-v3': {'int4': 'large-v3-q5_0'},
+        'large-v3-turbo': {'int8': 'large-v3-turbo-q8_0', 'int4': 'large-v3-turbo-q5_0'},
+    }
+    
+    @classmethod
+    def model_name(cls, model_size: str, quantization: str) -> str:
+        """Published ggml model name for a size and quantization mode"""
+        model_name = cls.GGML_MODELS.get(model_size, {}).get(quantization)
+        if model_name is None:
+            supported = [size for size, models in cls.GGML_MODELS.items() if quantization in models]
+            raise ValueError(
+                f"whisper.cpp publishes no {quantization} model for '{model_size}'. "
+                f"Sizes with {quantization} models: {supported}"
+            )
+        return model_name
+    
+    def __init__(self, model_size: str, quantization: str, num_threads: int):
+        model_name = self.model_name(model_size, quantization)
+        
+        from pywhispercpp.model import Model
+        
+        logger.info(f"Loading whisper.cpp model: {model_name}")
+        self._model = Model(model_name, n_threads=num_threads, print_progress=False)
+    
+    def transcribe(self, audio: str, **options) -> Dict:
+        language = options.get('language')
+        word_timestamps = options.get('word_timestamps', False)
+        result = {}
+        if language is None:
+            (language, probability), _ = self._model.auto_detect_language(audio)
+            result['language_probability'] = probability
+        
+        # For word timing, whisper.cpp splits its output into one segment per
+        # word (params persist on the model, so always set them)
+        segments = self._model.transcribe(
+            audio,
+            language=language,
+            translate=options.get('task') == 'translate',
+            initial_prompt=options.get('initial_prompt') or '',
+            no_context=not options.get('condition_on_previous_text', False),
+            temperature=options.get('temperature', 0.0),
+            token_timestamps=word_timestamps,
+            split_on_word=word_timestamps,
+            max_len=1 if word_timestamps else 0,
+        )
+        
+        # whisper.cpp reports timestamps in centiseconds
+        pieces = [
+            {'text': seg.text, 'start': seg.t0 / 100.0, 'end': seg.t1 / 100.0}
+            for seg in segments
+        ]
+        result['language'] = language
+        if word_timestamps:
+            result['segments'] = _group_words([
+                {'word': piece['text'], 'start': piece['start'], 'end': piece['end'],
+                 'probability': 1.0}
+                for piece in pieces if piece['text'].strip()
+            ])
+        else:
+            result['segments'] = pieces
+        result['text'] = ''.join(seg['text'] for seg in result['segments'])
+        return result
+
+
+class _TransformersBackend:
+    """
+    Hugging Face transformers backend with bitsandbytes weight quantization
+    Exposes a Whisper-compatible transcribe() returning the same result dict
+    """
+    
+    def __init__(self, model_size: str, quantization: str, device: str):
+        import torch
+        from transformers import (
+            AutoModelForSpeechSeq2Seq,
+            AutoProcessor,
+            BitsAndBytesConfig,
+            pipeline,
+        )
+        
+        if quantization == 'int4':
+            quant_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type='nf4',
+                bnb_4bit_compute_dtype=torch.float16,
+            )
+        else:
+            quant_config = BitsAndBytesConfig(load_in_8bit=True)
+        
+        model_id = f"openai/whisper-{model_size}"
+        logger.info(f"Loading {model_id} with {quantization} weights")
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            model_id,
+            quantization_config=quant_config,
+            torch_dtype=torch.float16,
+            device_map=device,
+        )
+        processor = AutoProcessor.from_pretrained(model_id)
+        self._pipe = pipeline(
+            'automatic-speech-recognition',
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            torch_dtype=torch.float16,
+            chunk_length_s=30,
+        )
+    
+    def transcribe(self, audio: str, **options) -> Dict:
+        generate_kwargs = {'task': options.get('task', 'transcribe')}
+        language = options.get('language')
+        if language is not None:
+            generate_kwargs['language'] = language
+        
+        # Word mode returns one chunk per word instead of per segment
+        word_timestamps = options.get('word_timestamps', False)
+        output = self._pipe(
+            audio,
+            return_timestamps='word' if word_timestamps else True,
+            generate_kwargs=generate_kwargs,
+        )
+        
+        pieces = []
+        for chunk in output.get('chunks', []):
+            start, end = chunk['timestamp']
+            start = start or 0.0
+            pieces.append({
+                'text': chunk['text'],
+                'start': start,
+                'end': end if end is not None else start,
+            })
+        
+        if word_timestamps:
+            segments = _group_words([
+                {'word': piece['text'], 'start': piece['start'], 'end': piece['end'],
+                 'probability': 1.0}
+                for piece in pieces if piece['text'].strip()
+            ])
+        else:
+            segments = pieces
+        
+        result = {'text': output.get('text', ''), 'segments': segments}
+        if language is not None:
+            result['language'] = language
+        return result
+
+
 class LyricsExtractor:
     """
     Extract lyrics from audio using OpenAI Whisper
@@ -98,6 +358,16 @@ class LyricsExtractor:
         'zh': 'chinese',
     }
     
+    # Explicit language codes (excludes 'auto') for O(1) membership checks
+    _LANG_KEYS = frozenset(SUPPORTED_LANGUAGES) - {'auto'}
+    
+    # Language-specific prompts to help the model
+    LANGUAGE_PROMPTS = {
+        'ar': "♪ أغنية عربية",  # Arabic song
+        'en': "♪ Song lyrics",
+        'fr': "♪ Paroles de chanson",
+    }
+    
     MODEL_SIZES = {
         'tiny': 'tiny',
         'base': 'base',
@@ -106,6 +376,12 @@ class LyricsExtractor:
         'large': 'large-v3',  # Best quality
     }
     
+    # Weight precision: None/'fp16' use native Whisper, 'int8'/'int4' use
+    # whisper.cpp on CPU or bitsandbytes on CUDA. 'int4' is 4-bit NF4 on
+    # CUDA; whisper.cpp has no 4-bit Whisper models, so on CPU it loads
+    # the 5-bit ggml model instead
+    QUANTIZATION_MODES = (None, 'fp16', 'int8', 'int4')
+    
     # Known Whisper hallucinations - repetitive promotional/filler text
     HALLUCINATION_PATTERNS = [
         # Arabic hallucinations
@@ -164,7 +440,8 @@ class LyricsExtractor:
         self,
         model_size: str = "medium",
         device: Optional[str] = None,
-        num_threads: Optional[int] = None
+        num_threads: Optional[int] = None,
+        quantization: Optional[str] = None
     ):
         """
         Initialize lyrics extractor
@@ -173,25 +450,46 @@ class LyricsExtractor:
             model_size: Whisper model size (tiny/base/small/medium/large)
             device: Device to use (cuda/cpu/auto)
             num_threads: Number of CPU threads to use (None = auto-detect max)
+            quantization: Weight precision (None/fp16/int8/int4). int8/int4
+                cut memory roughly in half for large models at a small
+                accuracy cost. On CPU, int4 means whisper.cpp's 5-bit models
         """
+        if quantization not in self.QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unsupported quantization: {quantization}. "
+                f"Choose from {[q for q in self.QUANTIZATION_MODES if q]}"
+            )
+        
         self.model_size = self.MODEL_SIZES.get(model_size, model_size)
         self.device = device
         self.num_threads = num_threads
+        self.quantization = quantization
         self.model = None
         self._loaded = False
+        # Pinned host staging buffer + copy stream for CUDA input transfers
+        self._host_buf = None
+        self._copy_stream = None
         
     def _load_model(self):
         """Lazy load Whisper model with maximum performance settings"""
         if self._loaded:
             return
             
+        import os
+        
+        quantized = self.quantization in ('int8', 'int4')
+        max_threads = self.num_threads or os.cpu_count() or 8
+        
         try:
-            import whisper
             import torch
-            import os
-            
+        except ImportError:
+            if not quantized:
+                logger.error("Whisper not installed. Install with: pip install openai-whisper")
+                raise ImportError("openai-whisper is required for lyrics extraction")
+            torch = None  # whisper.cpp runs without torch
+        
+        if torch is not None:
             # Set maximum threads for CPU operations (only if not already started)
-            max_threads = self.num_threads or os.cpu_count() or 8
             try:
                 torch.set_num_threads(max_threads)
             except RuntimeError:
@@ -200,32 +498,106 @@ class LyricsExtractor:
             # Enable optimizations
             if hasattr(torch, 'set_float32_matmul_precision'):
                 torch.set_float32_matmul_precision('high')
-            
-            logger.info(f"Loading Whisper model: {self.model_size}")
-            logger.info(f"Using {max_threads} CPU threads for maximum performance")
-            
-            # Determine device - MPS has float64 issues, prefer CUDA > CPU > MPS
-            if self.device is None:
-                if torch.cuda.is_available():
-                    self.device = "cuda"
-                    # Enable TF32 for faster GPU computation
-                    torch.backends.cuda.matmul.allow_tf32 = True
-                    torch.backends.cudnn.allow_tf32 = True
-                    torch.backends.cudnn.benchmark = True
-                    logger.info("CUDA enabled with TF32 optimizations")
-                else:
-                    # MPS (Apple Silicon) has float64 dtype issues with Whisper
-                    # Using CPU for better compatibility
-                    self.device = "cpu"
-                    logger.info("Using CPU with maximum thread optimization")
-            
+        
+        logger.info(f"Loading Whisper model: {self.model_size}")
+        logger.info(f"Using {max_threads} CPU threads for maximum performance")
+        
+        # Determine device - MPS has float64 issues, prefer CUDA > CPU > MPS
+        if self.device is None:
+            if torch is not None and torch.cuda.is_available():
+                self.device = "cuda"
+                # Enable TF32 for faster GPU computation
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.backends.cudnn.allow_tf32 = True
+                torch.backends.cudnn.benchmark = True
+                logger.info("CUDA enabled with TF32 optimizations")
+            else:
+                # MPS (Apple Silicon) has float64 dtype issues with Whisper
+                # Using CPU for better compatibility
+                self.device = "cpu"
+                logger.info("Using CPU with maximum thread optimization")
+        
+        if quantized:
+            # Backend-specific install hints are attached to its ImportError
+            self.model = self._load_quantized_backend(max_threads)
+        else:
+            try:
+                import whisper
+            except ImportError:
+                logger.error("Whisper not installed. Install with: pip install openai-whisper")
+                raise ImportError("openai-whisper is required for lyrics extraction")
             self.model = whisper.load_model(self.model_size, device=self.device)
-            self._loaded = True
-            logger.info(f"Whisper model loaded on {self.device}")
+        self._loaded = True
+        logger.info(f"Whisper model loaded on {self.device}")
+    
+    def _load_quantized_backend(self, num_threads: int):
+        """
+        Load a quantized Whisper backend behind a transcribe()-compatible adapter
+        
+        Args:
+            num_threads: CPU threads for the whisper.cpp backend
             
+        Returns:
+            Backend object exposing transcribe(audio, **options)
+        """
+        if self.device == "cuda":
+            try:
+                return _TransformersBackend(self.model_size, self.quantization, self.device)
+            except ImportError:
+                raise ImportError(
+                    f"{self.quantization} Whisper on CUDA requires: "
+                    "pip install transformers accelerate bitsandbytes"
+                )
+        
+        try:
+            return _WhisperCppBackend(self.model_size, self.quantization, num_threads)
         except ImportError:
-            logger.error("Whisper not installed. Install with: pip install openai-whisper")
-            raise ImportError("openai-whisper is required for lyrics extraction")
+            raise ImportError(
+                f"{self.quantization} Whisper on CPU requires: pip install pywhispercpp"
+            )
+    
+    def _prepare_audio_input(self, audio_path: Path):
+        """
+        Prepare the audio passed to Whisper's transcribe
+        
+        On CUDA the decoded waveform is staged through a reusable pinned host
+        buffer and copied to the GPU asynchronously on a side stream, so the
+        mel spectrogram is computed on-device. Other devices get the path.
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            CUDA tensor of 16 kHz mono samples, or the path as a string
+        """
+        if self.device != "cuda" or self.quantization in ('int8', 'int4'):
+            return str(audio_path)
+        
+        import whisper
+        import torch
+        
+        audio = whisper.load_audio(str(audio_path))
+        n_samples = audio.shape[0]
+        
+        if self._copy_stream is None:
+            self._copy_stream = torch.cuda.Stream()
+        else:
+            # Previous async copy must finish before the buffer is reused
+            self._copy_stream.synchronize()
+        
+        if self._host_buf is None or self._host_buf.numel() < n_samples:
+            self._host_buf = torch.empty(n_samples, dtype=torch.float32, pin_memory=True)
+        
+        host = self._host_buf[:n_samples]
+        host.copy_(torch.from_numpy(audio))
+        
+        with torch.cuda.stream(self._copy_stream):
+            device_audio = host.to("cuda", non_blocking=True)
+        
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(self._copy_stream)
+        device_audio.record_stream(compute_stream)
+        return device_audio
     
     def _is_hallucination(self, text: str) -> bool:
         """
@@ -374,25 +746,22 @@ class LyricsExtractor:
         }
         
         # Set language if not auto
-        if language != 'auto' and language in self.SUPPORTED_LANGUAGES:
+        if language in self._LANG_KEYS:
             options['language'] = language
             # Add language-specific prompts to help the model
-            if language == 'ar':
-                options['initial_prompt'] = "♪ أغنية عربية"  # Arabic song
-            elif language == 'en':
-                options['initial_prompt'] = "♪ Song lyrics"
-            elif language == 'fr':
-                options['initial_prompt'] = "♪ Paroles de chanson"
+            if language in self.LANGUAGE_PROMPTS:
+                options['initial_prompt'] = self.LANGUAGE_PROMPTS[language]
         
         # Transcribe
-        result = self.model.transcribe(str(audio_path), **options)
+        result = self.model.transcribe(self._prepare_audio_input(audio_path), **options)
         
         # Extract language info
         detected_language = result.get('language', language)
         
         # Process segments into lyrics lines with STRICT filtering
+        segments = result.get('segments') or []
         lines = []
-        for segment in result.get('segments', []):
+        for segment in segments:
             text = segment.get('text', '').strip()
             no_speech_prob = segment.get('no_speech_prob', 0)
             avg_logprob = segment.get('avg_logprob', 0)
@@ -458,11 +827,17 @@ class LyricsExtractor:
         if not lines:
             logger.warning("No valid lyrics detected - audio may be instrumental or unclear")
         
+        # Prefer the detector's language probability; otherwise fall back to
+        # the speech probability of the first segment
+        language_confidence = result.get('language_probability')
+        if language_confidence is None:
+            language_confidence = 1.0 - segments[0].get('no_speech_prob', 0) if segments else 0.5
+        
         return LyricsResult(
             text=full_text,
             lines=lines,
             language=detected_language,
-            language_confidence=1.0 - result.get('segments', [{}])[0].get('no_speech_prob', 0) if result.get('segments') else 0.5,
+            language_confidence=language_confidence,
             duration=duration
         )
     
@@ -508,26 +883,23 @@ class LyricsExtractor:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        outputs = {}
+        # Build every format in one traversal, then write the files concurrently
+        contents = result.render(formats)
+        outputs = {
+            fmt: output_dir / f"{base_name}_lyrics.{fmt}" for fmt in contents
+        }
         
-        for fmt in formats:
-            output_path = output_dir / f"{base_name}_lyrics.{fmt}"
-            
-            if fmt == 'txt':
-                content = result.text
-            elif fmt == 'lrc':
-                content = result.to_lrc()
-            elif fmt == 'srt':
-                content = result.to_srt()
-            elif fmt == 'json':
-                content = json.dumps(result.to_dict(), indent=2, ensure_ascii=False)
-            else:
-                continue
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            outputs[fmt] = output_path
+        def _write(fmt: str) -> None:
+            outputs[fmt].write_text(contents[fmt], encoding='utf-8', newline='\n')
+        
+        if len(outputs) > 1:
+            with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+                list(executor.map(_write, outputs))
+        else:
+            for fmt in outputs:
+                _write(fmt)
+        
+        for output_path in outputs.values():
             logger.info(f"Saved lyrics to: {output_path}")
         
         return outputs
@@ -548,6 +920,13 @@ class KaraokeLyrics:
         """
         self.result = lyrics_result
         self._build_word_timeline()
+        
+        # Sorted start/end times for seeking, plus cursors caching the last
+        # hit so forward playback resolves in O(1)
+        self._line_starts = [line.start_time for line in self.result.lines]
+        self._line_ends = [line.end_time for line in self.result.lines]
+        self._last_line_idx = 0
+        self._last_word_idx = 0
     
     def _build_word_timeline(self):
         """Build timeline of all words for karaoke highlighting"""
@@ -563,6 +942,31 @@ class KaraokeLyrics:
                     'end': word.get('end', 0),
                     'line_text': line.text
                 })
+        
+        self._word_starts = [word['start'] for word in self.word_timeline]
+        self._word_ends = [word['end'] for word in self.word_timeline]
+    
+    @staticmethod
+    def _seek(starts: List[float], time: float, hint: int) -> int:
+        """
+        Find the last entry starting at or before the given time
+        
+        Checks the cached cursor and its successor first, falling back to a
+        binary search on seeks.
+        
+        Args:
+            starts: Sorted start times
+            time: Playback time in seconds
+            hint: Index returned by the previous lookup
+            
+        Returns:
+            Index into starts, or -1 if time precedes every entry
+        """
+        n = len(starts)
+        for i in (hint, hint + 1):
+            if 0 <= i < n and starts[i] <= time and (i + 1 == n or starts[i + 1] > time):
+                return i
+        return bisect_right(starts, time) - 1
     
     def get_current_word(self, time: float) -> Optional[Dict]:
         """
@@ -574,9 +978,12 @@ class KaraokeLyrics:
         Returns:
             Word info dict or None
         """
-        for word in self.word_timeline:
-            if word['start'] <= time <= word['end']:
-                return word
+        idx = self._seek(self._word_starts, time, self._last_word_idx)
+        if idx < 0:
+            return None
+        self._last_word_idx = idx
+        if time <= self._word_ends[idx]:
+            return self.word_timeline[idx]
         return None
     
     def get_current_line(self, time: float) -> Optional[LyricLine]:
@@ -589,9 +996,12 @@ class KaraokeLyrics:
         Returns:
             LyricLine or None
         """
-        for line in self.result.lines:
-            if line.start_time <= time <= line.end_time:
-                return line
+        idx = self._seek(self._line_starts, time, self._last_line_idx)
+        if idx < 0:
+            return None
+        self._last_line_idx = idx
+        if time <= self._line_ends[idx]:
+            return self.result.lines[idx]
         return None
     
     def get_display_lines(self, time: float, window: int = 2) -> List[Dict]:
@@ -605,17 +1015,12 @@ class KaraokeLyrics:
         Returns:
             List of line dicts with timing info
         """
-        current_idx = -1
-        for i, line in enumerate(self.result.lines):
-            if line.start_time <= time <= line.end_time:
-                current_idx = i
-                break
-            elif line.start_time > time:
-                current_idx = max(0, i - 1)
-                break
+        if not self.result.lines:
+            return []
         
-        if current_idx == -1:
-            current_idx = len(self.result.lines) - 1
+        # Current line, or the last one started (first line before any start)
+        current_idx = max(0, self._seek(self._line_starts, time, self._last_line_idx))
+        self._last_line_idx = current_idx
         
         start_idx = max(0, current_idx - window)
         end_idx = min(len(self.result.lines), current_idx + window + 1)
@@ -672,13 +1077,14 @@ class KaraokeLyrics:
             
             data['lines'].append(line_data)
         
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return _dumps_json(data)
 
 
 def extract_lyrics(
     audio_path: Union[str, Path],
     language: str = "auto",
-    model_size: str = "medium"
+    model_size: str = "medium",
+    quantization: Optional[str] = None
 ) -> LyricsResult:
     """
     Convenience function to extract lyrics
@@ -687,9 +1093,10 @@ def extract_lyrics(
         audio_path: Path to audio file
         language: Language code or 'auto'
         model_size: Whisper model size
+        quantization: Weight precision (None/fp16/int8/int4)
         
     Returns:
         LyricsResult
     """
-    extractor = LyricsExtractor(model_size=model_size)
+    extractor = LyricsExtractor(model_size=model_size, quantization=quantization)
     return extractor.extract(audio_path, language=language)
@@ -218,6 +218,34 @@ class AudioProcessor:
         
         return stretched
     
+    def _load_audio(self, path: Union[str, Path]) -> np.ndarray:
+        """
+        Load audio at the processor's sample rate
+        
+        Files already at the target rate are read directly with soundfile,
+        skipping librosa's resampling wrapper and float64 round trip.
+        
+        Args:
+            path: Audio file path
+            
+        Returns:
+            float32 audio shaped (samples,) for mono or (channels, samples)
+        """
+        path = str(path)
+        try:
+            native_sr = sf.info(path).samplerate
+        except RuntimeError:
+            native_sr = None  # Format not readable by libsndfile (e.g. some MP3s)
+        
+        if native_sr == self.sample_rate:
+            audio, _ = sf.read(path, dtype='float32')
+            if audio.ndim > 1:
+                audio = np.ascontiguousarray(audio.T)
+            return audio
+        
+        audio, _ = librosa.load(path, sr=self.sample_rate, mono=False, res_type='soxr_hq')
+        return audio
+    
     def pitch_shift_file(
         self,
         input_path: Union[str, Path],
@@ -243,7 +271,7 @@ class AudioProcessor:
         output_path = Path(output_path)
         
         # Load audio
-        audio, sr = librosa.load(str(input_path), sr=self.sample_rate, mono=False)
+        audio = self._load_audio(input_path)
         
         # Pitch shift
         shifted = self.pitch_shift(audio, semitones, preserve_formants, algorithm)
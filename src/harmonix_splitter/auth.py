@@ -4,18 +4,21 @@ User management, authentication, and admin functionality
 """
 
 import os
-import json
+import copy
+import hmac
+import time
+import sqlite3
 import hashlib
 import secrets
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from functools import wraps
+from dataclasses import dataclass
 from flask import session, redirect, url_for, request, flash
 
-# User data storage (JSON file-based for simplicity)
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-USERS_FILE = DATA_DIR / "users.json"
-CONTACTS_FILE = DATA_DIR / "contacts.json"
+from harmonix_splitter import db
+from harmonix_splitter.db import DATA_DIR, USER_COLUMNS, CONTACT_COLUMNS
 
 # Ensure data directory exists
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -92,6 +95,36 @@ PLANS = {
 }
 
 
+@dataclass(frozen=True, slots=True)
+class Plan:
+    """Immutable view of a PLANS entry used by the usage and stats checks"""
+    name: str
+    price: int
+    price_display: str
+    songs_per_month: int
+    stems: int
+    stem_types: tuple
+    lyrics: str
+    export_formats: tuple
+    commercial_use: bool
+    priority_processing: bool
+    api_access: bool
+    custom_models: bool
+    dedicated_support: bool
+    features: tuple
+
+
+_PLAN_OBJS = {
+    key: Plan(**{k: tuple(v) if isinstance(v, list) else v for k, v in plan.items()})
+    for key, plan in PLANS.items()
+}
+
+
+def _plan(plan_name: str) -> Plan:
+    """Get the Plan object by name (falls back to free)"""
+    return _PLAN_OBJS.get(plan_name) or _PLAN_OBJS["free"]
+
+
 def get_plan(plan_name: str) -> dict:
     """Get plan details by name"""
     return PLANS.get(plan_name, PLANS["free"])
@@ -104,12 +137,11 @@ def get_all_plans() -> dict:
 
 def check_usage_limit(username: str) -> dict:
     """Check if user has reached their usage limit for the month"""
-    users = load_users()
-    if username not in users:
+    user = _fetch_user(_connect(), username)
+    if user is None:
         return {"allowed": False, "reason": "User not found"}
     
-    user = users[username]
-    plan = get_plan(user.get("plan", "free"))
+    plan = _plan(user.get("plan", "free"))
     
     # Get current month usage
     usage = user.get("usage", {})
@@ -117,7 +149,7 @@ def check_usage_limit(username: str) -> dict:
     month_usage = usage.get("monthly", {}).get(current_month, 0)
     
     # Check limit (-1 means unlimited)
-    limit = plan["songs_per_month"]
+    limit = plan.songs_per_month
     if limit == -1:
         return {"allowed": True, "used": month_usage, "limit": "unlimited", "remaining": "unlimited"}
     
@@ -134,55 +166,55 @@ def check_usage_limit(username: str) -> dict:
 
 def increment_song_usage(username: str) -> bool:
     """Increment the song usage counter for a user"""
-    users = load_users()
-    if username not in users:
-        return False
-    
-    # Initialize usage structure if needed
-    if "usage" not in users[username]:
-        users[username]["usage"] = {"songs_processed": 0, "stems_downloaded": 0, "monthly": {}}
-    if "monthly" not in users[username]["usage"]:
-        users[username]["usage"]["monthly"] = {}
-    
-    # Increment monthly counter
-    current_month = datetime.now().strftime("%Y-%m")
-    users[username]["usage"]["monthly"][current_month] = users[username]["usage"]["monthly"].get(current_month, 0) + 1
-    
-    # Increment total counter
-    users[username]["usage"]["songs_processed"] = users[username]["usage"].get("songs_processed", 0) + 1
-    
-    save_users(users)
+    conn = _connect()
+    with db.transaction(conn):
+        user = _fetch_user(conn, username)
+        if user is None:
+            return False
+        
+        # Initialize usage structure if needed
+        usage = user.get("usage") or {"songs_processed": 0, "stems_downloaded": 0}
+        monthly = usage.setdefault("monthly", {})
+        
+        # Increment monthly counter
+        current_month = datetime.now().strftime("%Y-%m")
+        monthly[current_month] = monthly.get(current_month, 0) + 1
+        
+        # Increment total counter
+        usage["songs_processed"] = usage.get("songs_processed", 0) + 1
+        
+        conn.execute("UPDATE users SET usage = ? WHERE username = ?", (db.dumps(usage), username))
+    _invalidate_user(username)
     return True
 
 
 def get_user_stats(username: str) -> dict:
     """Get detailed user statistics"""
-    users = load_users()
-    if username not in users:
+    user = _cached_user(username)
+    if user is None:
         return {}
     
-    user = users[username]
-    plan = get_plan(user.get("plan", "free"))
+    plan = _plan(user.get("plan", "free"))
     usage = user.get("usage", {})
     
     current_month = datetime.now().strftime("%Y-%m")
     month_usage = usage.get("monthly", {}).get(current_month, 0)
     
-    limit = plan["songs_per_month"]
+    limit = plan.songs_per_month
     
     return {
         "plan": user.get("plan", "free"),
-        "plan_name": plan["name"],
+        "plan_name": plan.name,
         "songs_this_month": month_usage,
         "songs_limit": limit if limit != -1 else "unlimited",
         "songs_remaining": "unlimited" if limit == -1 else max(0, limit - month_usage),
         "total_songs_processed": usage.get("songs_processed", 0),
         "total_stems_downloaded": usage.get("stems_downloaded", 0),
-        "stems_available": plan["stems"],
-        "stem_types": plan["stem_types"],
-        "export_formats": plan["export_formats"],
-        "has_api_access": plan["api_access"],
-        "has_commercial_license": plan["commercial_use"],
+        "stems_available": plan.stems,
+        "stem_types": list(plan.stem_types),
+        "export_formats": list(plan.export_formats),
+        "has_api_access": plan.api_access,
+        "has_commercial_license": plan.commercial_use,
         "member_since": user.get("created_at"),
         "last_login": user.get("last_login")
     }
@@ -193,97 +225,263 @@ def upgrade_plan(username: str, new_plan: str) -> bool:
     if new_plan not in PLANS:
         return False
     
-    users = load_users()
-    if username not in users:
-        return False
-    
-    users[username]["plan"] = new_plan
-    users[username]["plan_upgraded_at"] = datetime.now().isoformat()
-    save_users(users)
+    conn = _connect()
+    with db.transaction(conn):
+        user = _fetch_user(conn, username)
+        if user is None:
+            return False
+        
+        user["plan"] = new_plan
+        user["plan_upgraded_at"] = datetime.now().isoformat()
+        _write_user(conn, user)
+    _invalidate_user(username)
     return True
 
 
 # ==================== PASSWORD FUNCTIONS ====================
 
 
+# Iterations used by hashes stored before schemes were tagged (bare hex digests)
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+
+def _current_scheme() -> tuple[str, list[int]]:
+    """Scheme and parameters used for new password hashes"""
+    from harmonix_splitter.config.settings import get_settings
+    settings = get_settings()
+    if settings.password_hash_scheme == "scrypt" and hasattr(hashlib, "scrypt"):
+        return "scrypt", [settings.scrypt_n, settings.scrypt_r, settings.scrypt_p]
+    return "pbkdf2_sha256", [settings.pbkdf2_iterations]
+
+
+# hashlib's OpenSSL KDFs release the GIL, so request threads hash in parallel;
+# cap concurrent runs at one per core so a login burst can't starve other work
+_kdf_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+def _derive(password: str, salt: str, scheme: str, params: list[int]) -> bytes:
+    """Run the key derivation function for a scheme (OpenSSL-backed)"""
+    with _kdf_slots:
+        if scheme == "scrypt":
+            n, r, p = params
+            return hashlib.scrypt(
+                password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+                maxmem=128 * r * n + 1024 * 1024, dklen=32
+            )
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), params[0])
+
+
+def _parse_hash(hashed: str) -> tuple[str, list[int], str]:
+    """Split a stored hash into (scheme, params, hex digest)"""
+    if "$" not in hashed:
+        return "pbkdf2_sha256", [LEGACY_PBKDF2_ITERATIONS], hashed
+    scheme, *params, digest = hashed.split("$")
+    return scheme, [int(x) for x in params], digest
+
+
 def hash_password(password: str, salt: str | None = None) -> tuple[str, str]:
-    """Hash a password with salt"""
+    """
+    Hash a password with salt
+    
+    New hashes use scrypt by default (PASSWORD_HASH_SCHEME) and are stored as
+    "<scheme>$<params...>$<hex digest>".
+    """
     if salt is None:
         salt = secrets.token_hex(16)
-    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return hashed.hex(), salt
+    
+    scheme, params = _current_scheme()
+    digest = _derive(password, salt, scheme, params).hex()
+    return "$".join([scheme, *map(str, params), digest]), salt
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Check whether a stored hash uses outdated scheme or parameters"""
+    scheme, params, _ = _parse_hash(hashed)
+    return (scheme, params) != _current_scheme()
 
 
 def verify_password(password: str, hashed: str, salt: str) -> bool:
-    """Verify a password against its hash"""
-    new_hash, _ = hash_password(password, salt)
-    return new_hash == hashed
+    """
+    Verify a password against its hash
+    
+    Successful checks are remembered for PASSWORD_CACHE_TTL seconds so repeat
+    logins skip the key derivation. Entries are keyed on the stored hash, so a password
+    change invalidates them, and hold only a keyed HMAC of the password.
+    """
+    key = (hashed, hmac.new(_password_memo_key, f"{salt}:{password}".encode(), "sha256").digest())
+    now = time.monotonic()
+    expires = _verified_passwords.get(key)
+    if expires is not None and expires > now:
+        return True
+    
+    scheme, params, digest = _parse_hash(hashed)
+    candidate = _derive(password, salt, scheme, params).hex()
+    if not hmac.compare_digest(candidate, digest):
+        return False
+    
+    with _cache_lock:
+        if len(_verified_passwords) >= _PASSWORD_CACHE_SIZE:
+            for k in [k for k, exp in _verified_passwords.items() if exp <= now]:
+                del _verified_passwords[k]
+            if len(_verified_passwords) >= _PASSWORD_CACHE_SIZE:
+                _verified_passwords.clear()
+        _verified_passwords[key] = now + PASSWORD_CACHE_TTL
+    return True
+
+
+# ==================== LOOKUP CACHES ====================
+
+# Per-process caches; TTLs bound staleness across workers
+USER_CACHE_TTL = 60  # seconds
+PASSWORD_CACHE_TTL = 30  # seconds
+_PASSWORD_CACHE_SIZE = 1024
+
+_cache_lock = threading.Lock()
+_user_cache: dict[str, tuple[float, dict]] = {}
+_verified_passwords: dict[tuple[str, bytes], float] = {}
+_password_memo_key = secrets.token_bytes(32)
+
+
+def _cached_user(username: str) -> dict | None:
+    """Fetch a user through the TTL cache (returns a private copy)"""
+    now = time.monotonic()
+    entry = _user_cache.get(username)
+    if entry is not None and entry[0] > now:
+        return copy.deepcopy(entry[1])
+    
+    db.batcher.flush()
+    user = _fetch_user(_connect(), username)
+    if user is not None:
+        with _cache_lock:
+            _user_cache[username] = (now + USER_CACHE_TTL, user)
+        return copy.deepcopy(user)
+    return None
+
+
+def _invalidate_user(username: str | None = None):
+    """Drop a cached user (or every cached user when username is None)"""
+    with _cache_lock:
+        if username is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(username, None)
+
+
+# ==================== STORAGE ====================
+
+_seed_lock = threading.Lock()
+_seeded = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Get the database connection, creating the default admin on first use"""
+    global _seeded
+    conn = db.get_connection()
+    if not _seeded:
+        with _seed_lock:
+            if not _seeded:
+                _ensure_default_admin(conn)
+                _seeded = True
+    return conn
+
+
+def _ensure_default_admin(conn: sqlite3.Connection):
+    """Create the default admin user when the users table is empty"""
+    if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+        return
+    
+    # Set default admin password
+    pw_hash, salt = hash_password("admin123")
+    admin = {
+        "username": "admin",
+        "email": "admin@harmonix.app",
+        "password_hash": pw_hash,
+        "salt": salt,
+        "role": "admin",
+        "name": "Administrator",
+        "created_at": datetime.now().isoformat(),
+        "last_login": None,
+        "is_active": True,
+        "plan": "studio",
+        "usage": {"songs_processed": 0, "stems_downloaded": 0}
+    }
+    db.insert(conn, "users", db.encode_record(admin, USER_COLUMNS), or_ignore=True)
+
+
+# Credential columns never returned by listing queries
+_SENSITIVE = frozenset({"password_hash", "salt"})
+_PUBLIC_USER_SELECT = ", ".join(
+    [c for c in USER_COLUMNS if c not in _SENSITIVE] + ["extra"]
+)
+
+
+def _fetch_user(conn: sqlite3.Connection, username: str) -> dict | None:
+    """Fetch a single user record (including its username) or None"""
+    row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+    return db.decode_row(row) if row else None
+
+
+def _write_user(conn: sqlite3.Connection, user: dict):
+    """Insert or update a user record (must contain its username)"""
+    db.upsert(conn, "users", "username", db.encode_record(user, USER_COLUMNS))
+
+
+def _public_user(user: dict) -> dict:
+    """Drop the username key so records match the legacy users-dict layout"""
+    return {k: v for k, v in user.items() if k != "username"}
 
 
 def load_users() -> dict:
-    """Load users from JSON file"""
-    if not USERS_FILE.exists():
-        # Create default admin user
-        default_users = {
-            "admin": {
-                "email": "admin@harmonix.app",
-                "password_hash": "",
-                "salt": "",
-                "role": "admin",
-                "name": "Administrator",
-                "created_at": datetime.now().isoformat(),
-                "last_login": None,
-                "is_active": True,
-                "plan": "studio",
-                "usage": {"songs_processed": 0, "stems_downloaded": 0}
-            }
-        }
-        # Set default admin password
-        pw_hash, salt = hash_password("admin123")
-        default_users["admin"]["password_hash"] = pw_hash
-        default_users["admin"]["salt"] = salt
-        save_users(default_users)
-        return default_users
-    
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+    """Load all users as a username -> user data mapping"""
+    db.batcher.flush()
+    rows = _connect().execute("SELECT * FROM users ORDER BY rowid").fetchall()
+    users = {}
+    for row in rows:
+        user = db.decode_row(row)
+        users[user.pop("username")] = user
+    return users
 
 
 def save_users(users: dict):
-    """Save users to JSON file"""
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2, default=str)
+    """Replace the stored users with the given username -> user data mapping"""
+    db.batcher.flush()
+    conn = _connect()
+    with db.transaction(conn):
+        for username, data in users.items():
+            _write_user(conn, {**data, "username": username})
+        placeholders = ", ".join("?" for _ in users)
+        conn.execute(
+            f"DELETE FROM users WHERE username NOT IN ({placeholders})", list(users)
+        )
+    _invalidate_user()
 
 
 def load_contacts() -> list:
-    """Load contact submissions from JSON file"""
-    if not CONTACTS_FILE.exists():
-        return []
-    with open(CONTACTS_FILE, 'r') as f:
-        return json.load(f)
+    """Load all contact submissions in submission order"""
+    rows = _connect().execute("SELECT * FROM contacts ORDER BY rowid").fetchall()
+    return [db.decode_row(row) for row in rows]
 
 
 def save_contacts(contacts: list):
-    """Save contact submissions to JSON file"""
-    with open(CONTACTS_FILE, 'w') as f:
-        json.dump(contacts, f, indent=2, default=str)
+    """Replace the stored contact submissions"""
+    conn = _connect()
+    with db.transaction(conn):
+        conn.execute("DELETE FROM contacts")
+        for contact in contacts:
+            db.insert(conn, "contacts", db.encode_record(contact, CONTACT_COLUMNS))
 
 
 def create_user(username: str, email: str, password: str, name: str = "", role: str = "user") -> dict:
     """Create a new user"""
-    users = load_users()
+    conn = _connect()
     
-    if username in users:
+    if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
         raise ValueError("Username already exists")
     
-    # Check if email already exists
-    for user in users.values():
-        if user.get("email") == email:
-            raise ValueError("Email already registered")
-    
     pw_hash, salt = hash_password(password)
     
-    users[username] = {
+    user = {
+        "username": username,
         "email": email,
         "password_hash": pw_hash,
         "salt": salt,
@@ -296,101 +494,123 @@ def create_user(username: str, email: str, password: str, name: str = "", role:
         "usage": {"songs_processed": 0, "stems_downloaded": 0}
     }
     
-    save_users(users)
-    return users[username]
+    try:
+        db.insert(conn, "users", db.encode_record(user, USER_COLUMNS))
+    except sqlite3.IntegrityError:
+        # Emails are unique regardless of case; a taken username here means
+        # we lost a race with a concurrent registration
+        if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+            raise ValueError("Username already exists")
+        raise ValueError("Email already registered")
+    return _public_user(user)
 
 
 def authenticate_user(username: str, password: str) -> dict | None:
     """Authenticate a user and return their data"""
-    users = load_users()
-    
-    # Allow login with username or email
-    user_data = None
-    actual_username = None
-    
-    if username in users:
-        user_data = users[username]
-        actual_username = username
-    else:
-        # Check by email
-        for uname, data in users.items():
-            if data.get("email") == username:
-                user_data = data
-                actual_username = uname
-                break
-    
-    if not user_data:
+    conn = _connect()
+    
+    # Allow login with username or email (username match wins)
+    row = conn.execute(
+        "SELECT * FROM users WHERE username = ? OR email = ? COLLATE NOCASE "
+        "ORDER BY username = ? DESC LIMIT 1",
+        (username, username, username)
+    ).fetchone()
+    
+    if row is None:
         return None
     
+    user_data = db.decode_row(row)
     if not user_data.get("is_active", True):
         return None
     
     if verify_password(password, user_data["password_hash"], user_data["salt"]):
-        # Update last login
-        users[actual_username]["last_login"] = datetime.now().isoformat()
-        save_users(users)
-        return {"username": actual_username, **user_data}
+        # Update last login (batched; nothing reads it back within the request)
+        user_data["last_login"] = datetime.now().isoformat()
+        db.batcher.submit(
+            "UPDATE users SET last_login = ? WHERE username = ?",
+            (user_data["last_login"], user_data["username"]),
+            key=user_data["username"]
+        )
+        
+        # Upgrade legacy hashes while the plaintext is at hand
+        if needs_rehash(user_data["password_hash"]):
+            pw_hash, salt = hash_password(password)
+            conn.execute(
+                "UPDATE users SET password_hash = ?, salt = ? WHERE username = ?",
+                (pw_hash, salt, user_data["username"])
+            )
+            user_data["password_hash"], user_data["salt"] = pw_hash, salt
+        _invalidate_user(user_data["username"])
+        return user_data
     
     return None
 
 
 def get_user(username: str) -> dict | None:
     """Get user data by username"""
-    users = load_users()
-    if username in users:
-        return {"username": username, **users[username]}
-    return None
+    return _cached_user(username)
 
 
 def update_user(username: str, updates: dict) -> dict | None:
     """Update user data"""
-    users = load_users()
-    if username not in users:
-        return None
-    
-    # Don't allow updating sensitive fields directly
-    safe_fields = ["name", "email", "plan", "is_active", "role", "avatar", "bio"]
-    for key, value in updates.items():
-        if key in safe_fields:
-            users[username][key] = value
-    
-    save_users(users)
-    return users[username]
+    conn = _connect()
+    try:
+        with db.transaction(conn):
+            user = _fetch_user(conn, username)
+            if user is None:
+                return None
+            
+            # Don't allow updating sensitive fields directly
+            safe_fields = ["name", "email", "plan", "is_active", "role", "avatar", "bio"]
+            for key, value in updates.items():
+                if key in safe_fields:
+                    user[key] = value
+            
+            _write_user(conn, user)
+    except sqlite3.IntegrityError:
+        return None  # Email already registered to another user
+    _invalidate_user(username)
+    return _public_user(user)
 
 
 def change_password(username: str, old_password: str, new_password: str) -> bool:
     """Change user password"""
-    users = load_users()
-    if username not in users:
+    conn = _connect()
+    user = _fetch_user(conn, username)
+    if user is None:
         return False
     
-    user = users[username]
     if not verify_password(old_password, user["password_hash"], user["salt"]):
         return False
     
     pw_hash, salt = hash_password(new_password)
-    users[username]["password_hash"] = pw_hash
-    users[username]["salt"] = salt
-    save_users(users)
+    conn.execute(
+        "UPDATE users SET password_hash = ?, salt = ? WHERE username = ?",
+        (pw_hash, salt, username)
+    )
+    _invalidate_user(username)
     return True
 
 
 def delete_user(username: str) -> bool:
     """Delete a user"""
-    users = load_users()
-    if username not in users:
-        return False
     if username == "admin":
         return False  # Can't delete admin
-    del users[username]
-    save_users(users)
-    return True
+    cursor = _connect().execute("DELETE FROM users WHERE username = ?", (username,))
+    _invalidate_user(username)
+    return cursor.rowcount > 0
 
 
 def get_all_users() -> list:
     """Get all users (for admin)"""
-    users = load_users()
-    return [{"id": k, "username": k, **{key: val for key, val in v.items() if key not in ['password_hash', 'salt']}} for k, v in users.items()]
+    db.batcher.flush()
+    rows = _connect().execute(f"SELECT {_PUBLIC_USER_SELECT} FROM users ORDER BY rowid").fetchall()
+    users = []
+    for row in rows:
+        user = db.decode_row(row)
+        user["id"] = user["username"]
+        users.append(user)
+    return users
 
 
 def get_user_by_id(user_id: str) -> dict | None:
@@ -400,37 +620,36 @@ def get_user_by_id(user_id: str) -> dict | None:
 
 def get_user_by_email(email: str) -> dict | None:
     """Get user by email address"""
-    users = load_users()
-    for username, data in users.items():
-        if data.get("email") == email:
-            return {"id": username, "username": username, **data}
-    return None
+    row = _connect().execute(
+        "SELECT * FROM users WHERE email = ? COLLATE NOCASE", (email,)
+    ).fetchone()
+    if row is None:
+        return None
+    user = db.decode_row(row)
+    return {"id": user["username"], **user}
 
 
 def get_contact_by_id(contact_id: str) -> dict | None:
     """Get a contact by ID"""
-    contacts = load_contacts()
-    for contact in contacts:
-        if contact.get("id") == contact_id:
-            return contact
-    return None
+    row = _connect().execute("SELECT * FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+    return db.decode_row(row) if row else None
 
 
 def increment_usage(username: str, field: str):
     """Increment a usage counter for a user"""
-    users = load_users()
-    if username in users:
-        if "usage" not in users[username]:
-            users[username]["usage"] = {"songs_processed": 0, "stems_downloaded": 0}
-        users[username]["usage"][field] = users[username]["usage"].get(field, 0) + 1
-        save_users(users)
+    conn = _connect()
+    with db.transaction(conn):
+        user = _fetch_user(conn, username)
+        if user is not None:
+            usage = user.get("usage") or {"songs_processed": 0, "stems_downloaded": 0}
+            usage[field] = usage.get(field, 0) + 1
+            conn.execute("UPDATE users SET usage = ? WHERE username = ?", (db.dumps(usage), username))
+    _invalidate_user(username)
 
 
 def add_contact_submission(name: str, email: str, subject: str, message: str, 
                            category: str = "general") -> dict:
     """Add a contact form submission"""
-    contacts = load_contacts()
-    
     submission = {
         "id": secrets.token_hex(8),
         "name": name,
@@ -445,8 +664,7 @@ def add_contact_submission(name: str, email: str, subject: str, message: str,
         "reply_at": None
     }
     
-    contacts.append(submission)
-    save_contacts(contacts)
+    db.insert(_connect(), "contacts", db.encode_record(submission, CONTACT_COLUMNS))
     return submission
 
 
@@ -457,13 +675,14 @@ def get_all_contacts() -> list:
 
 def update_contact(contact_id: str, updates: dict) -> dict | None:
     """Update a contact submission"""
-    contacts = load_contacts()
-    for i, contact in enumerate(contacts):
-        if contact["id"] == contact_id:
-            contacts[i].update(updates)
-            save_contacts(contacts)
-            return contacts[i]
-    return None
+    conn = _connect()
+    with db.transaction(conn):
+        contact = get_contact_by_id(contact_id)
+        if contact is None:
+            return None
+        contact.update(updates)
+        db.upsert(conn, "contacts", "id", db.encode_record(contact, CONTACT_COLUMNS))
+    return contact
 
 
 def reply_to_contact(contact_id: str, reply: str) -> dict | None:
@@ -478,61 +697,43 @@ def reply_to_contact(contact_id: str, reply: str) -> dict | None:
 
 def delete_contact(contact_id: str) -> bool:
     """Delete a contact submission"""
-    contacts = load_contacts()
-    for i, contact in enumerate(contacts):
-        if contact["id"] == contact_id:
-            contacts.pop(i)
-            save_contacts(contacts)
-            return True
-    return False
+    cursor = _connect().execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+    return cursor.rowcount > 0
 
 
 def get_admin_stats() -> dict:
     """Get admin dashboard statistics"""
-    users = load_users()
-    contacts = load_contacts()
-    
-    now = datetime.now()
-    week_ago = now - timedelta(days=7)
-    today = now.strftime("%Y-%m-%d")
+    conn = _connect()
+    week_ago = (datetime.now() - timedelta(days=7)).isoformat()
     
     # Count users by plan
     plan_counts = {"free": 0, "creator": 0, "studio": 0}
-    total_songs = 0
+    for plan, count in conn.execute("SELECT plan, COUNT(*) FROM users GROUP BY plan"):
+        if plan in plan_counts:
+            plan_counts[plan] = count
+    
+    # ISO timestamps compare correctly as strings
+    total_users, total_songs, new_users_week = conn.execute(
+        "SELECT COUNT(*), "
+        "COALESCE(SUM(json_extract(usage, '$.songs_processed')), 0), "
+        "COUNT(CASE WHEN created_at > ? THEN 1 END) "
+        "FROM users",
+        (week_ago,)
+    ).fetchone()
+    
+    # Daily processing would need per-day tracking
     songs_today = 0
-    new_users_week = 0
     
-    for username, user in users.items():
-        # Count by plan
-        plan = user.get("plan", "free")
-        if plan in plan_counts:
-            plan_counts[plan] += 1
-        
-        # Count songs
-        usage = user.get("usage", {})
-        total_songs += usage.get("songs_processed", 0)
-        
-        # Check for daily processing (simplified - would need actual tracking)
-        songs_today = 0  # Would need daily tracking to implement
-        
-        # Count new users this week
-        created_at = user.get("created_at")
-        if created_at:
-            try:
-                user_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                if user_date.replace(tzinfo=None) > week_ago:
-                    new_users_week += 1
-            except:
-                pass
+    total_contacts, pending_contacts = conn.execute(
+        "SELECT COUNT(*), COUNT(CASE WHEN status = 'new' OR NOT replied THEN 1 END) "
+        "FROM contacts"
+    ).fetchone()
     
     # Calculate monthly revenue
-    monthly_revenue = (plan_counts["creator"] * 19) + (plan_counts["studio"] * 49)
-    
-    # Count pending contacts
-    pending_contacts = sum(1 for c in contacts if c.get("status") == "new" or not c.get("replied"))
+    monthly_revenue = sum(_PLAN_OBJS[plan].price * count for plan, count in plan_counts.items())
     
     return {
-        "total_users": len(users),
+        "total_users": total_users,
         "new_users_week": new_users_week,
         "free_users": plan_counts["free"],
         "creator_users": plan_counts["creator"],
@@ -540,7 +741,7 @@ def get_admin_stats() -> dict:
         "total_songs": total_songs,
         "songs_today": songs_today,
         "pending_contacts": pending_contacts,
-        "total_contacts": len(contacts),
+        "total_contacts": total_contacts,
         "monthly_revenue": monthly_revenue
     }
 
@@ -581,24 +782,58 @@ def get_current_user() -> dict | None:
 
 # ==================== ACTIVITY TRACKING ====================
 
-ACTIVITY_FILE = DATA_DIR / "activities.json"
+# Activities kept per user
+MAX_ACTIVITIES_PER_USER = 100
+
+# Inserts per user between trims; readers cap at MAX_ACTIVITIES_PER_USER so
+# the slack is never visible
+ACTIVITY_TRIM_INTERVAL = 25
+
+_trim_lock = threading.Lock()
+_inserts_since_trim: dict[str, int] = {}
+
+
+def _decode_activity(row: sqlite3.Row) -> dict:
+    """Convert an activities row into the activity dict layout"""
+    return {
+        "type": row["type"],
+        "description": row["description"],
+        "timestamp": row["timestamp"],
+        "ts": row["ts"],
+        "metadata": db.loads(row["metadata"])
+    }
 
 
 def load_activities() -> dict:
-    """Load activities from JSON file"""
-    if not ACTIVITY_FILE.exists():
-        return {}
-    try:
-        with open(ACTIVITY_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+    """Load all activities as username -> list (most recent first)"""
+    db.batcher.flush()
+    rows = _connect().execute(
+        "SELECT * FROM ("
+        "  SELECT *, ROW_NUMBER() OVER (PARTITION BY username ORDER BY id DESC) AS n"
+        "  FROM activities"
+        ") WHERE n <= ? ORDER BY username, id DESC",
+        (MAX_ACTIVITIES_PER_USER,)
+    ).fetchall()
+    activities = {}
+    for row in rows:
+        activities.setdefault(row["username"], []).append(_decode_activity(row))
+    return activities
 
 
 def save_activities(activities: dict):
-    """Save activities to JSON file"""
-    with open(ACTIVITY_FILE, 'w') as f:
-        json.dump(activities, f, indent=2)
+    """Replace the stored activities with a username -> list mapping"""
+    db.batcher.flush()
+    conn = _connect()
+    with db.transaction(conn):
+        conn.execute("DELETE FROM activities")
+        for username, entries in activities.items():
+            conn.executemany(
+                "INSERT INTO activities (username, type, description, timestamp, metadata, ts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(username, a["type"], a.get("description"), a["timestamp"],
+                  db.dumps(a.get("metadata") or {}), a.get("ts")) for a in reversed(entries)]
+            )
+        db.backfill_epochs(conn)
 
 
 def log_activity(username: str, activity_type: str, description: str, metadata: dict = None):
@@ -607,32 +842,36 @@ def log_activity(username: str, activity_type: str, description: str, metadata:
     
     activity_type: 'song_processed', 'download', 'login', 'logout', 'upload', 'midi_converted', etc.
     """
-    activities = load_activities()
-    
-    if username not in activities:
-        activities[username] = []
-    
-    activity = {
-        "type": activity_type,
-        "description": description,
-        "timestamp": datetime.now().isoformat(),
-        "metadata": metadata or {}
-    }
-    
-    # Add to the beginning of the list (most recent first)
-    activities[username].insert(0, activity)
-    
-    # Keep only the last 100 activities per user
-    activities[username] = activities[username][:100]
-    
-    save_activities(activities)
+    _connect()
+    now = datetime.now()
+    db.batcher.submit(
+        "INSERT INTO activities (username, type, description, timestamp, metadata, ts) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (username, activity_type, description, now.isoformat(),
+         db.dumps(metadata or {}), int(now.timestamp()))
+    )
+    
+    # Trim to the last 100 activities every few inserts rather than on each
+    with _trim_lock:
+        count = _inserts_since_trim.get(username, 0) + 1
+        _inserts_since_trim[username] = count % ACTIVITY_TRIM_INTERVAL
+    if count >= ACTIVITY_TRIM_INTERVAL:
+        db.batcher.submit(
+            "DELETE FROM activities WHERE username = ? AND id <= "
+            "(SELECT id FROM activities WHERE username = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (username, username, MAX_ACTIVITIES_PER_USER),
+            key=username
+        )
 
 
 def get_user_activities(username: str, limit: int = 10) -> list:
     """Get recent activities for a user"""
-    activities = load_activities()
-    user_activities = activities.get(username, [])
-    return user_activities[:limit]
+    db.batcher.flush()
+    rows = _connect().execute(
+        "SELECT * FROM activities WHERE username = ? ORDER BY id DESC LIMIT ?",
+        (username, min(limit, MAX_ACTIVITIES_PER_USER))
+    ).fetchall()
+    return [_decode_activity(row) for row in rows]
 
 
 def get_activity_icon(activity_type: str) -> str:
@@ -652,14 +891,16 @@ def get_activity_icon(activity_type: str) -> str:
     return icons.get(activity_type, 'fa-circle')
 
 
-def format_time_ago(timestamp_str: str) -> str:
-    """Format a timestamp as 'X time ago'"""
+def format_time_ago(timestamp: int | float | str) -> str:
+    """
+    Format a timestamp as 'X time ago'
+    
+    Accepts a Unix epoch (the activity "ts" field) or an ISO string.
+    """
     try:
-        timestamp = datetime.fromisoformat(timestamp_str)
-        now = datetime.now()
-        diff = now - timestamp
-        
-        seconds = diff.total_seconds()
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp).timestamp()
+        seconds = time.time() - timestamp
         
         if seconds < 60:
             return "Just now"
@@ -676,7 +917,7 @@ def format_time_ago(timestamp_str: str) -> str:
             weeks = int(seconds // 604800)
             return f"{weeks} week{'s' if weeks != 1 else ''} ago"
         else:
-            return timestamp.strftime("%b %d, %Y")
-    except:
+            return datetime.fromtimestamp(timestamp).strftime("%b %d, %Y")
+    except (TypeError, ValueError, OverflowError, OSError):
         return "Unknown"
 
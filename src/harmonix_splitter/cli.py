@@ -5,8 +5,11 @@ Usage: harmonix-split input.mp3 --mode studio --quality per_instrument
 """
 
 import argparse
+import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Optional, List
 
@@ -19,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Separator line for per-file log banners
+BANNER = '=' * 60
+
 
 def parse_args():
     """Parse command-line arguments"""
@@ -44,6 +50,9 @@ Examples:
 
   # Batch process multiple files
   harmonix-split *.mp3 --output ./batch_stems
+
+  # Batch process on CPU, 4 files at a time
+  harmonix-split *.mp3 --cpu-only --jobs 4
         """
     )
     
@@ -93,6 +102,14 @@ Examples:
         help='Force CPU processing (disable GPU)'
     )
     
+    # Parallelism
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of files to process in parallel (CPU only; default: 1)'
+    )
+    
     # Analysis
     parser.add_argument(
         '--analyze-only',
@@ -170,9 +187,9 @@ def analyze_audio(orchestrator, audio_path: Path):
         orchestrator: HarmonixOrchestrator instance
         audio_path: Path to audio file
     """
-    logger.info(f"\n{'='*60}")
+    logger.info(f"\n{BANNER}")
     logger.info(f"Analyzing: {audio_path.name}")
-    logger.info(f"{'='*60}")
+    logger.info(BANNER)
     
     try:
         result = orchestrator.analyze_only(audio_path)
@@ -187,7 +204,7 @@ def analyze_audio(orchestrator, audio_path: Path):
         logger.info(f"  Mode: {recs.get('mode', 'N/A')}")
         logger.info(f"  Complexity: {len(result['detected_instruments'])} instruments detected")
         
-        logger.info(f"\n{'='*60}\n")
+        logger.info(f"\n{BANNER}\n")
         
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
@@ -212,9 +229,9 @@ def process_audio(
         mode: Separation mode
         instruments: Target instruments
     """
-    logger.info(f"\n{'='*60}")
+    logger.info(f"\n{BANNER}")
     logger.info(f"Processing: {audio_path.name}")
-    logger.info(f"{'='*60}")
+    logger.info(BANNER)
     logger.info(f"Quality: {quality}")
     logger.info(f"Mode: {mode}")
     if instruments:
@@ -224,9 +241,8 @@ def process_audio(
     # Create job ID from filename
     job_id = audio_path.stem
     
-    # Create output subdirectory for this file
+    # Output subdirectory for this file (created up front by main)
     file_output_dir = output_dir / audio_path.stem
-    file_output_dir.mkdir(parents=True, exist_ok=True)
     
     try:
         # Process
@@ -247,15 +263,99 @@ def process_audio(
                 logger.info(f"  • {stem_name}.mp3")
             
             logger.info(f"\nOutput location: {file_output_dir}")
-            logger.info(f"{'='*60}\n")
+            logger.info(f"{BANNER}\n")
             
         else:
             logger.error(f"\n✗ Failed: {result.metadata.get('error', 'Unknown error')}")
-            logger.info(f"{'='*60}\n")
+            logger.info(f"{BANNER}\n")
             
     except Exception as e:
         logger.error(f"\n✗ Processing failed: {e}")
-        logger.info(f"{'='*60}\n")
+        logger.info(f"{BANNER}\n")
+
+
+# Per-process orchestrator used by --jobs workers
+_worker_orchestrator = None
+
+
+def _init_worker(auto_route: bool, torch_threads: int, warmup: Optional[dict]):
+    """Create (and optionally warm up) a CPU orchestrator once per worker process"""
+    global _worker_orchestrator
+    
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    
+    settings = Settings()
+    settings.use_gpu = False
+    _worker_orchestrator = create_orchestrator(auto_route=auto_route, settings=settings)
+    if warmup is not None:
+        warmup_orchestrator(_worker_orchestrator, **warmup)
+
+
+def _analyze_in_worker(audio_path: Path):
+    analyze_audio(_worker_orchestrator, audio_path)
+
+
+def _process_in_worker(audio_path: Path, **kwargs):
+    process_audio(_worker_orchestrator, audio_path, **kwargs)
+
+
+def _warmup_options(args, target_instruments: Optional[List[str]]) -> Optional[dict]:
+    """Separation config to preload, or None in analysis-only mode"""
+    if args.analyze_only:
+        return None
+    return {'quality': args.quality, 'mode': args.mode, 'target_instruments': target_instruments}
+
+
+def warmup_orchestrator(orchestrator, **options):
+    """
+    Load the separation model before the processing loop
+    
+    Failures are only logged; each file then reports the error as before.
+    """
+    try:
+        orchestrator.warmup(**options)
+    except Exception as e:
+        logger.warning(f"Model warmup failed: {e}")
+
+
+def run_parallel(args, input_paths: List[Path], jobs: int, output_dir: Path,
+                 target_instruments: Optional[List[str]]):
+    """
+    Process files across worker processes, each with its own orchestrator
+    
+    Args:
+        args: Parsed CLI arguments
+        input_paths: Validated input files
+        jobs: Number of worker processes
+        output_dir: Output directory
+        target_instruments: Target instruments
+    """
+    # Split the cores between workers so torch doesn't oversubscribe
+    torch_threads = max(1, (os.cpu_count() or 1) // jobs)
+    logger.info(f"Processing {len(input_paths)} files with {jobs} workers")
+    
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(not args.no_auto_route, torch_threads, _warmup_options(args, target_instruments))
+    ) as executor:
+        if args.analyze_only:
+            list(executor.map(_analyze_in_worker, input_paths))
+        else:
+            list(executor.map(
+                partial(
+                    _process_in_worker,
+                    output_dir=output_dir,
+                    quality=args.quality,
+                    mode=args.mode,
+                    instruments=target_instruments
+                ),
+                input_paths
+            ))
 
 
 def main():
@@ -268,9 +368,9 @@ def main():
     # Validate inputs
     input_paths = validate_inputs(args.input)
     
-    logger.info("=" * 60)
+    logger.info(BANNER)
     logger.info("Harmonix Audio Splitter v1.0.0")
-    logger.info("=" * 60)
+    logger.info(BANNER)
     
     # Create settings
     settings = Settings()
@@ -278,20 +378,40 @@ def main():
         settings.use_gpu = False
         logger.info("GPU disabled - using CPU only")
     
-    # Create orchestrator
-    orchestrator = create_orchestrator(
-        auto_route=not args.no_auto_route,
-        settings=settings
-    )
-    
     # Parse target instruments
     target_instruments = None
     if args.instruments:
         target_instruments = [i.strip() for i in args.instruments.split(',')]
     
-    # Create output directory
+    # Create output directory and per-file subdirectories
     output_dir = Path(args.output)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if not args.analyze_only:
+        for subdir in {output_dir / p.stem for p in input_paths}:
+            subdir.mkdir(parents=True, exist_ok=True)
+    else:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    
+    jobs = max(1, min(args.jobs, len(input_paths)))
+    if jobs > 1 and settings.use_gpu:
+        # A single GPU is the bottleneck; parallel workers would only contend for it
+        logger.warning("--jobs is only used with --cpu-only; processing files sequentially")
+        jobs = 1
+    
+    if jobs > 1:
+        run_parallel(args, input_paths, jobs, output_dir, target_instruments)
+        logger.info("All processing complete!")
+        return
+    
+    # Create orchestrator
+    orchestrator = create_orchestrator(
+        auto_route=not args.no_auto_route,
+        settings=settings
+    )
+    
+    # Load the model once before the loop
+    options = _warmup_options(args, target_instruments)
+    if options is not None:
+        warmup_orchestrator(orchestrator, **options)
     
     # Process files
     if args.analyze_only:
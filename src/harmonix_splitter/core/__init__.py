@@ -1,5 +1,11 @@
 """Harmonix core processing modules"""
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .separator import HarmonixSeparator, create_separator
+    from .preprocessor import AudioPreprocessor
+
 # Lazy imports to avoid requiring torch for dashboard-only deployment
 def __getattr__(name):
     if name == "HarmonixSeparator":
@@ -3,21 +3,29 @@ Harmonix Orchestrator
 Routes audio through analysis and separation pipelines
 """
 
+import os
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from ..analysis.detector import InstrumentDetector
 from ..core.separator import HarmonixSeparator, SeparationConfig, QualityMode, SeparationMode
 from ..core.preprocessor import AudioPreprocessor
-from ..config.settings import Settings
+from ..config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Routing-plan strings -> enum members, without Enum.__call__ per job
+_QUALITY_MODES = {m.value: m for m in QualityMode}
+_SEPARATION_MODES = {m.value: m for m in SeparationMode}
 
-@dataclass
+
+@dataclass(slots=True)
 class ProcessingResult:
     """Result from complete processing pipeline"""
     job_id: str
@@ -39,6 +47,14 @@ class HarmonixOrchestrator:
     5. Post-processing & export
     """
     
+    # Separators kept per orchestrator; long-lived orchestrators (the
+    # dashboard's) would otherwise hold one per configuration ever used
+    MAX_SEPARATORS = 4
+    
+    # Default batch_process concurrency: separation is serialized, so more
+    # workers would only hold more tracks in memory while they wait
+    BATCH_WORKERS = 2
+    
     def __init__(
         self,
         settings: Optional[Settings] = None,
@@ -51,7 +67,7 @@ class HarmonixOrchestrator:
             settings: Application settings
             auto_route: Automatically select best routing based on analysis
         """
-        self.settings = settings or Settings()
+        self.settings = settings or get_settings()
         self.auto_route = auto_route
         
         # Initialize components
@@ -63,8 +79,41 @@ class HarmonixOrchestrator:
             thresholds=self.settings.detection_thresholds
         )
         
+        # Separators (and their loaded models) reused across files
+        self._separators: "OrderedDict[tuple, HarmonixSeparator]" = OrderedDict()
+        self._separators_lock = threading.Lock()
+        # One inference at a time, on the GPU or CPU (each run already uses
+        # every core); analysis and saving of other files overlap
+        self._device_lock = threading.Lock()
+        
         logger.info("Harmonix Orchestrator initialized")
     
+    def warmup(
+        self,
+        quality: str = "balanced",
+        mode: str = "grouped",
+        target_instruments: Optional[List[str]] = None
+    ):
+        """
+        Load the separation model for a configuration ahead of processing
+        
+        Batch callers use this so the first file doesn't pay the model
+        load inside the processing loop.
+        
+        Args:
+            quality: Quality mode (fast/balanced/studio)
+            mode: Separation mode (grouped/per_instrument/karaoke)
+            target_instruments: Specific instruments to extract
+        """
+        routing_plan = self._create_routing_plan(
+            detected=[],
+            scores={},
+            quality=quality,
+            mode=mode,
+            target_instruments=target_instruments
+        )
+        self._get_separator(routing_plan)
+    
     def process(
         self,
         audio_path: Union[str, Path],
@@ -73,7 +122,8 @@ class HarmonixOrchestrator:
         mode: Optional[str] = None,
         target_instruments: Optional[List[str]] = None,
         output_dir: Optional[Union[str, Path]] = None,
-        custom_name: Optional[str] = None
+        custom_name: Optional[str] = None,
+        skip_validation: bool = False
     ) -> ProcessingResult:
         """
         Process audio file through complete pipeline
@@ -85,22 +135,28 @@ class HarmonixOrchestrator:
             mode: Separation mode (grouped/per_instrument)
             target_instruments: Specific instruments to extract
             output_dir: Output directory for stems
+            skip_validation: Caller already ran validate_audio on this file
             
         Returns:
             ProcessingResult with all outputs and metadata
         """
-        audio_path = Path(audio_path)
+        # The preprocessor and detector take a Path; everything else here
+        # only needs strings
+        if not isinstance(audio_path, Path):
+            audio_path = Path(audio_path)
+        filename = os.path.basename(audio_path)
         start_time = time.time()
         
-        logger.info(f"[{job_id}] Starting orchestration for: {audio_path.name}")
+        logger.info(f"[{job_id}] Starting orchestration for: {filename}")
         
         try:
             # Stage 1: Validation & Preprocessing
-            logger.info(f"[{job_id}] Stage 1: Validation")
-            validation = self.preprocessor.validate_audio(audio_path)
-            
-            if not validation[0]:
-                raise ValueError(f"Invalid audio: {validation[1]}")
+            if not skip_validation:
+                logger.info(f"[{job_id}] Stage 1: Validation")
+                validation = self.preprocessor.validate_audio(audio_path)
+                
+                if not validation[0]:
+                    raise ValueError(f"Invalid audio: {validation[1]}")
             
             # Stage 2: Instrument Detection & Analysis
             logger.info(f"[{job_id}] Stage 2: Instrument Detection")
@@ -130,7 +186,7 @@ class HarmonixOrchestrator:
             logger.info(f"[{job_id}] Stage 4: Stem Separation")
             
             # Create job-specific output directory
-            job_output_dir = Path(output_dir or self.settings.output_dir) / job_id
+            job_output_dir = os.path.join(output_dir or self.settings.output_dir, job_id)
             
             stems = self._execute_separation(
                 audio_path=audio_path,
@@ -156,7 +212,7 @@ class HarmonixOrchestrator:
                 instrument_scores=scores,
                 processing_time=processing_time,
                 metadata={
-                    "filename": audio_path.name,
+                    "filename": filename,
                     "routing": routing_plan,
                     "stages_completed": 4
                 }
@@ -206,10 +262,13 @@ class HarmonixOrchestrator:
         else:
             recommended_mode = mode or self.settings.default_mode
         
+        # Mean detection confidence, computed once
+        avg_confidence = sum(scores.values()) / len(scores) if scores else 0
+        
         # Determine quality
         if not quality:
             # Auto-select based on complexity
-            complexity = len(detected) * sum(scores.values()) / len(scores)
+            complexity = len(detected) * avg_confidence
             if complexity > 4.0:
                 quality = "fast"  # Complex mix - prioritize speed
             else:
@@ -229,7 +288,7 @@ class HarmonixOrchestrator:
             "quality": quality,
             "target_instruments": target_instruments,
             "detected_count": len(detected),
-            "avg_confidence": sum(scores.values()) / len(scores) if scores else 0
+            "avg_confidence": avg_confidence
         }
     
     def _execute_separation(
@@ -251,13 +310,19 @@ class HarmonixOrchestrator:
         Returns:
             Dictionary of separated stems
         """
-        # Create separation config with quality settings
+        separator = self._get_separator(routing_plan)
+        
+        # Perform separation; only the inference itself is serialized
+        return separator.separate(audio_path, output_dir, custom_name, device_lock=self._device_lock)
+    
+    def _separation_config(self, routing_plan: Dict) -> SeparationConfig:
+        """Build the separation config for a routing plan"""
         # Determine preview_mode from orchestrator attribute
         preview_mode = getattr(self, 'preview_mode', False)
         
-        config = SeparationConfig(
-            quality=QualityMode(routing_plan["quality"]),
-            mode=SeparationMode(routing_plan["mode"]),
+        return SeparationConfig(
+            quality=_QUALITY_MODES[routing_plan["quality"]],
+            mode=_SEPARATION_MODES[routing_plan["mode"]],
             target_instruments=routing_plan.get("target_instruments"),
             use_gpu=self.settings.use_gpu,
             # Quality preservation settings
@@ -268,24 +333,44 @@ class HarmonixOrchestrator:
             preview_mode=preview_mode,  # Process only 30 seconds if True
             preview_duration=30,        # Preview duration in seconds
         )
+    
+    def _get_separator(self, routing_plan: Dict) -> HarmonixSeparator:
+        """
+        Get a separator for a routing plan, loading its models on first use
         
-        # Initialize separator
-        separator = HarmonixSeparator(config)
-        
-        # Perform separation
-        stems = separator.separate(audio_path, output_dir, custom_name)
-        
-        return stems
+        The least recently used separators beyond MAX_SEPARATORS are dropped;
+        their models are freed unless another separator still shares them.
+        """
+        # Keyed on the plan's primitives so repeat jobs skip building a config
+        key = (
+            routing_plan["quality"],
+            routing_plan["mode"],
+            tuple(routing_plan.get("target_instruments") or ()),
+            self.settings.use_gpu,
+            getattr(self, 'preview_mode', False),
+        )
+        with self._separators_lock:
+            separator = self._separators.get(key)
+            if separator is None:
+                separator = HarmonixSeparator(self._separation_config(routing_plan))
+                self._separators[key] = separator
+                while len(self._separators) > self.MAX_SEPARATORS:
+                    self._separators.popitem(last=False)
+            else:
+                self._separators.move_to_end(key)
+        return separator
     
     def analyze_only(
         self,
-        audio_path: Union[str, Path]
+        audio_path: Union[str, Path],
+        skip_validation: bool = False
     ) -> Dict:
         """
         Perform only analysis without separation
         
         Args:
             audio_path: Path to audio file
+            skip_validation: Caller already ran validate_audio on this file
             
         Returns:
             Analysis results
@@ -293,9 +378,10 @@ class HarmonixOrchestrator:
         audio_path = Path(audio_path)
         
         # Validate
-        validation = self.preprocessor.validate_audio(audio_path)
-        if not validation[0]:
-            raise ValueError(f"Invalid audio: {validation[1]}")
+        if not skip_validation:
+            validation = self.preprocessor.validate_audio(audio_path)
+            if not validation[0]:
+                raise ValueError(f"Invalid audio: {validation[1]}")
         
         # Detect instruments
         detected, scores = self.detector.detect_instruments(
@@ -320,35 +406,41 @@ class HarmonixOrchestrator:
         self,
         audio_paths: List[Union[str, Path]],
         base_job_id: str,
+        max_workers: Optional[int] = None,
+        skip_validation: bool = False,
         **kwargs
     ) -> List[ProcessingResult]:
         """
-        Process multiple audio files
+        Process multiple audio files concurrently
+        
+        Validation, detection and saving of other files overlap with
+        separation; separations themselves run one at a time.
         
         Args:
             audio_paths: List of audio file paths
             base_job_id: Base identifier for jobs
+            max_workers: Files processed concurrently (default: BATCH_WORKERS)
+            skip_validation: All paths were already validated upstream
             **kwargs: Additional arguments for process()
             
         Returns:
-            List of processing results
+            List of processing results, in input order
         """
-        results = []
+        if not audio_paths:
+            return []
         
-        for idx, audio_path in enumerate(audio_paths):
+        def run(idx: int, audio_path: Union[str, Path]) -> ProcessingResult:
             job_id = f"{base_job_id}_{idx}"
-            
             try:
-                result = self.process(
+                return self.process(
                     audio_path=audio_path,
                     job_id=job_id,
+                    skip_validation=skip_validation,
                     **kwargs
                 )
-                results.append(result)
-                
             except Exception as e:
                 logger.error(f"Batch job {job_id} failed: {e}")
-                results.append(ProcessingResult(
+                return ProcessingResult(
                     job_id=job_id,
                     status="failed",
                     stems={},
@@ -356,7 +448,12 @@ class HarmonixOrchestrator:
                     instrument_scores={},
                     processing_time=0.0,
                     metadata={"error": str(e)}
-                ))
+                )
+        
+        workers = max_workers or min(len(audio_paths), self.BATCH_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="harmonix-batch") as executor:
+            futures = [executor.submit(run, idx, path) for idx, path in enumerate(audio_paths)]
+            results = [future.result() for future in futures]
         
         logger.info(
             f"Batch processing complete: {sum(1 for r in results if r.status == 'completed')}/{len(results)} succeeded"
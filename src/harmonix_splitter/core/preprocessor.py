@@ -1,27 +1,89 @@
 """Audio preprocessing utilities."""
 
+import os
 import logging
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
 
 import librosa
 import soundfile as sf
 import numpy as np
 
+try:
+    import soxr
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# soundfile subtype for each supported WAV bit depth
+WAV_SUBTYPES = {16: "PCM_16", 24: "PCM_24", 32: "FLOAT"}
+
+
+class AudioProbe(NamedTuple):
+    """Header fields of an audio file."""
+    duration: float
+    samplerate: int
+    channels: int
+    format: str
+    subtype: str
+    frames: int
+
+
+@lru_cache(maxsize=128)
+def _probe(path_str: str, mtime_ns: int, size: int) -> AudioProbe:
+    """
+    Read an audio file header.
+    
+    Cached per path; mtime and size are part of the key so a rewritten file
+    is probed again.
+    """
+    # Open for the header only; sf.info also formats a full description
+    with sf.SoundFile(path_str) as f:
+        return AudioProbe(
+            duration=f.frames / f.samplerate,
+            samplerate=f.samplerate,
+            channels=f.channels,
+            format=f.format,
+            subtype=f.subtype,
+            frames=f.frames
+        )
+
+
+def probe_audio(file_path: Path, st: Optional[os.stat_result] = None) -> AudioProbe:
+    """
+    Get header information for an audio file through the probe cache.
+    
+    Args:
+        file_path: Path to audio file
+        st: The file's stat result, if the caller already has it
+    
+    Raises:
+        OSError: If the file can't be stat'ed
+        RuntimeError: If libsndfile can't read the file
+    """
+    if st is None:
+        st = file_path.stat()
+    return _probe(str(file_path), st.st_mtime_ns, st.st_size)
+
 
 class AudioPreprocessor:
     """Handles audio file validation, format conversion, and preprocessing."""
     
-    SUPPORTED_FORMATS = [".mp3", ".wav", ".flac", ".m4a", ".ogg", ".aac"]
+    SUPPORTED_FORMATS = frozenset({".mp3", ".wav", ".flac", ".m4a", ".ogg", ".aac"})
+    
+    # Inputs converted to WAV in-process instead of through ffmpeg
+    SNDFILE_FORMATS = frozenset({".wav", ".flac", ".ogg", ".aif", ".aiff"})
     
     def __init__(
         self,
         target_sr: int = 44100,
         max_duration: Optional[int] = None,
-        normalize: bool = True
+        normalize: bool = True,
+        bit_depth: int = 24
     ):
         """
         Initialize audio preprocessor.
@@ -30,10 +92,12 @@ class AudioPreprocessor:
             target_sr: Target sample rate
             max_duration: Maximum duration in seconds
             normalize: Whether to normalize audio
+            bit_depth: Bit depth of preprocessed WAV files (16, 24 or 32)
         """
         self.target_sr = target_sr
         self.max_duration = max_duration
         self.normalize = normalize
+        self.wav_subtype = WAV_SUBTYPES.get(bit_depth, "PCM_24")
     
     def validate_audio(self, file_path: Path) -> Tuple[bool, Optional[str]]:
         """
@@ -46,16 +110,19 @@ class AudioPreprocessor:
             Tuple of (is_valid, error_message)
         """
         # Check file exists
-        if not file_path.exists():
+        try:
+            st = file_path.stat()
+        except OSError:
             return False, "File does not exist"
         
         # Check file extension
-        if file_path.suffix.lower() not in self.SUPPORTED_FORMATS:
-            return False, f"Unsupported format. Supported: {self.SUPPORTED_FORMATS}"
+        suffix = file_path.suffix
+        if suffix not in self.SUPPORTED_FORMATS and suffix.lower() not in self.SUPPORTED_FORMATS:
+            return False, f"Unsupported format. Supported: {sorted(self.SUPPORTED_FORMATS)}"
         
         # Try to load and get info
         try:
-            info = sf.info(str(file_path))
+            info = probe_audio(file_path, st)
             
             # Check duration
             if self.max_duration and info.duration > self.max_duration:
@@ -93,16 +160,18 @@ class AudioPreprocessor:
         if not is_valid:
             raise ValueError(f"Invalid audio: {error}")
         
-        # Load audio
-        y, sr = librosa.load(input_path, sr=self.target_sr, mono=False)
-        
-        # Convert to stereo if mono
-        if y.ndim == 1:
-            y = np.stack([y, y])
+        # Load audio as (frames, channels)
+        y = self._load_audio(input_path)
         
         # Normalize
         if self.normalize:
-            y = self._normalize_audio(y)
+            # y was freshly loaded here, so it can be scaled in place
+            y = self._normalize_audio(y, inplace=y.flags.writeable)
+        
+        # Convert to stereo if mono; the duplicated channel is a read-only
+        # view, interleaved once by soundfile when writing
+        if y.shape[1] == 1:
+            y = np.broadcast_to(y, (y.shape[0], 2))
         
         # Determine output path
         if output_path is None:
@@ -110,11 +179,37 @@ class AudioPreprocessor:
         
         # Save
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        sf.write(output_path, y.T, self.target_sr)
+        sf.write(output_path, y, self.target_sr, subtype=self.wav_subtype, format="WAV")
         
         logger.info(f"Preprocessed audio saved to: {output_path}")
         return output_path
     
+    def _load_audio(self, input_path: Path) -> np.ndarray:
+        """
+        Load audio at the target sample rate.
+        
+        Formats libsndfile can read go through soundfile and soxr directly;
+        anything else (e.g. M4A/AAC) falls back to librosa.
+        
+        Args:
+            input_path: Input audio file
+            
+        Returns:
+            float32 audio shaped (frames, channels)
+        """
+        try:
+            y, sr = sf.read(str(input_path), dtype='float32', always_2d=True)
+        except RuntimeError:
+            y, _ = librosa.load(input_path, sr=self.target_sr, mono=False)
+            return np.atleast_2d(y).T
+        
+        if sr != self.target_sr:
+            if SOXR_AVAILABLE:
+                y = soxr.resample(y, sr, self.target_sr, quality='HQ')
+            else:
+                y = librosa.resample(y.T, orig_sr=sr, target_sr=self.target_sr).T
+        return y
+    
     def convert_with_ffmpeg(
         self,
         input_path: Path,
@@ -134,7 +229,21 @@ class AudioPreprocessor:
         Returns:
             Path to converted file
         """
-        cmd = ["ffmpeg", "-i", str(input_path), "-y"]
+        if format == "wav" and input_path.suffix.lower() in self.SNDFILE_FORMATS:
+            # libsndfile decodes these; skip the ffmpeg process and its pipes
+            y = self._load_audio(input_path)
+            # libsndfile wraps out-of-range floats when writing PCM; saturate
+            # like ffmpeg's pcm_s16le (float sources, resampler overshoot)
+            np.clip(y, -1.0, 1.0, out=y)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            sf.write(str(output_path), y, self.target_sr, subtype="PCM_16")
+            return output_path
+        
+        # Only errors reach stderr, so the pipe never fills with progress lines
+        cmd = [
+            "ffmpeg", "-nostdin", "-hide_banner", "-nostats", "-loglevel", "error",
+            "-threads", "0", "-i", str(input_path), "-y"
+        ]
         
         if format == "mp3":
             cmd.extend(["-codec:a", "libmp3lame"])
@@ -149,10 +258,13 @@ class AudioPreprocessor:
         logger.info(f"Converting with ffmpeg: {' '.join(cmd)}")
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            subprocess.run(
+                cmd, check=True, stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
             return output_path
         except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg conversion failed: {e.stderr.decode()}")
+            logger.error(f"FFmpeg conversion failed: {e.stderr.decode(errors='replace')}")
             raise
     
     def get_audio_info(self, file_path: Path) -> dict:
@@ -166,7 +278,7 @@ class AudioPreprocessor:
             Dictionary with audio metadata
         """
         try:
-            info = sf.info(str(file_path))
+            info = probe_audio(file_path)
             
             return {
                 "duration": info.duration,
@@ -181,19 +293,25 @@ class AudioPreprocessor:
             return {}
     
     @staticmethod
-    def _normalize_audio(y: np.ndarray, target_db: float = -3.0) -> np.ndarray:
+    def _normalize_audio(
+        y: np.ndarray,
+        target_db: float = -3.0,
+        inplace: bool = False
+    ) -> np.ndarray:
         """
         Normalize audio to target peak level.
         
         Args:
             y: Audio array
             target_db: Target peak level in dB
+            inplace: Scale y itself instead of allocating a new array
             
         Returns:
             Normalized audio
         """
-        # Calculate current peak
-        peak = np.abs(y).max()
+        # Calculate current peak from max/min reductions, which avoids
+        # materializing an |y| temporary the size of the input
+        peak = max(float(y.max()), -float(y.min()))
         
         if peak == 0:
             return y
@@ -202,4 +320,7 @@ class AudioPreprocessor:
         target_peak = 10 ** (target_db / 20.0)
         
         # Normalize
-        return y * (target_peak / peak)
+        scale = np.asarray(target_peak / peak, dtype=y.dtype)
+        if inplace:
+            return np.multiply(y, scale, out=y)
+        return y * scale
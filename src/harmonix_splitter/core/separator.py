@@ -3,20 +3,47 @@ Harmonix Audio Stem Separator
 Core separation engine using Demucs v4 with GPU acceleration
 """
 
-import torch
-import torchaudio
+import os
+import platform
+import random
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
 import numpy as np
-import librosa
 import soundfile as sf
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import logging
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
 from enum import Enum
 
+# torch, torchaudio and librosa are imported where they are used, so that
+# importing this module (config classes, estimates) doesn't pay for them
+if TYPE_CHECKING:
+    import torch
+    import torchaudio
+
 logger = logging.getLogger(__name__)
 
 
+def _to_int16(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert float audio to int16 PCM, saturating out-of-range samples
+    
+    Uses the 1/32768 scale _load_audio reads 16-bit PCM with, so 16-bit
+    sources round-trip exactly. Needs one float32 temporary.
+    """
+    pcm = np.multiply(audio, 32768.0, dtype=np.float32)
+    np.rint(pcm, out=pcm)
+    np.clip(pcm, -32768.0, 32767.0, out=pcm)
+    return pcm.astype(np.int16)
+
+
 class QualityMode(Enum):
     """Processing quality presets"""
     DRAFT = "draft"      # Ultra-fast for previews (~3x faster)
@@ -47,14 +74,37 @@ class SeparationConfig:
     overlap: float = 0.25  # Overlap ratio for segments
     
     # Output format settings - MP3 by default for smaller files
-    output_format: str = "mp3"  # "mp3" (compressed) or "wav" (lossless)
+    output_format: str = "mp3"  # "mp3" (compressed), "flac" or "wav" (lossless)
     bit_depth: int = 24  # 16, 24, or 32 for WAV
     mp3_bitrate: int = 320  # kbps for MP3 (320 = highest quality)
+    skip_silent_stems: bool = True  # Stems below -60 dBFS saved as 1s of silence
     
     # Studio quality settings
     shifts: int = 1  # Number of random shifts for TTA (test-time augmentation)
     split: bool = True  # Split audio into segments
     jobs: int = 0  # Number of parallel jobs (0=auto)
+    
+    # Inference precision: "auto" (mixed precision on CUDA except STUDIO),
+    # "fp32", "bf16" or "fp16" (the last two also opt Apple MPS in)
+    precision: str = "auto"
+    
+    # Read libsndfile formats directly as float32 instead of through librosa
+    low_memory: bool = True
+    
+    # torch.compile the model on CUDA (disable to debug in eager mode)
+    compile_model: bool = True
+    
+    # int8 dynamic quantization of Linear layers on x86 CPUs (not for STUDIO)
+    quantize_cpu: bool = True
+    
+    # Inputs longer than this (seconds) are kept in host memory and streamed
+    # to the GPU one window at a time (None = always load onto the device)
+    max_device_seconds: Optional[int] = 600
+    
+    # Inputs longer than this (seconds) are separated block by block into a
+    # disk-backed buffer, bounding host memory as well (None = never)
+    stream_threshold_seconds: Optional[int] = 1800
+    stream_block_seconds: int = 300
 
 
 @dataclass
@@ -65,6 +115,47 @@ class StemOutput:
     sample_rate: int
     confidence: float = 1.0
     metadata: Optional[Dict] = None
+    shared_id: Optional[int] = None  # Same value = same audio buffer, written once
+
+
+@dataclass(eq=False)
+class StemBundle(Mapping):
+    """
+    Stems from one separation stacked in a single array
+    
+    Reads as a mapping of stem name to StemOutput, so code written for
+    Dict[str, StemOutput] keeps working, while bulk operations can run
+    over audio for all stems in one numpy call.
+    """
+    names: List[str]
+    audio: np.ndarray  # (n_stems, channels, samples)
+    sample_rate: int
+    confidences: np.ndarray
+    metadata: List[Dict]
+    
+    def __post_init__(self):
+        self._index = {name: idx for idx, name in enumerate(self.names)}
+        self._outputs: Dict[str, StemOutput] = {}
+    
+    def __getitem__(self, name: str) -> StemOutput:
+        stem = self._outputs.get(name)
+        if stem is None:
+            idx = self._index[name]
+            stem = StemOutput(
+                name=name,
+                audio=self.audio[idx],
+                sample_rate=self.sample_rate,
+                confidence=float(self.confidences[idx]),
+                metadata=self.metadata[idx]
+            )
+            self._outputs[name] = stem
+        return stem
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+    
+    def __len__(self) -> int:
+        return len(self.names)
 
 
 class HarmonixSeparator:
@@ -73,6 +164,21 @@ class HarmonixSeparator:
     Supports Demucs v4, HTDemucs, and custom refinement models
     """
     
+    # Prepared models shared across instances, see _get_primary_model
+    _model_cache: "weakref.WeakValueDictionary[tuple, torch.nn.Module]" = weakref.WeakValueDictionary()
+    _model_cache_lock = threading.Lock()
+    # Strong references to the most recently used models, so one-shot
+    # separators (API jobs, the dashboard's startup pre-warm) don't free
+    # the model before the next request can reuse it
+    _recent_models: "OrderedDict[tuple, torch.nn.Module]" = OrderedDict()
+    RECENT_MODELS = 2
+    
+    # Cross-fade between consecutive blocks of a streamed separation
+    STREAM_OVERLAP_SECONDS = 5
+    
+    # Peak below which a stem counts as silent (-60 dBFS)
+    SILENCE_PEAK = 1e-3
+    
     CORE_STEMS = ["vocals", "drums", "bass", "other"]
     INSTRUMENT_STEMS = [
         "vocals", "drums", "bass", "guitar", "piano", 
@@ -88,7 +194,9 @@ class HarmonixSeparator:
         """
         self.config = config or SeparationConfig()
         self.device = self._setup_device()
+        self._params = self._get_separation_params()
         self.models = {}
+        self._resamplers: Dict[tuple, "torchaudio.transforms.Resample"] = {}
         self._load_models()
         
         logger.info(
@@ -96,8 +204,10 @@ class HarmonixSeparator:
             f"Quality: {self.config.quality.value}, Device: {self.device}"
         )
     
-    def _setup_device(self) -> torch.device:
+    def _setup_device(self) -> "torch.device":
         """Setup computation device (GPU/MPS/CPU)"""
+        import torch
+        
         if self.config.use_gpu:
             # Check for NVIDIA CUDA GPU
             if torch.cuda.is_available():
@@ -124,11 +234,8 @@ class HarmonixSeparator:
             
             # Select model based on quality
             model_name = self._get_model_name()
-            logger.info(f"Loading model: {model_name}")
-            
-            self.models['primary'] = get_model(model_name)
-            self.models['primary'].to(self.device)
-            self.models['primary'].eval()
+            self._amp_dtype = self._get_amp_dtype()
+            self.models['primary'] = self._get_primary_model(model_name, get_model)
             
             # Store apply function
             self._apply_model = apply_model
@@ -147,6 +254,126 @@ class HarmonixSeparator:
             logger.error(f"Failed to load models: {e}")
             raise
     
+    def _get_primary_model(self, model_name: str, get_model):
+        """
+        Load a model, or reuse one another separator already prepared
+        
+        Models are shared per name, device and preparation (compiled or
+        quantized) across separator instances. The cache holds them weakly,
+        so a model is freed once no separator uses it and it is not among
+        the RECENT_MODELS most recently used.
+        """
+        import torch
+        
+        compile_model = self.device.type == "cuda" and self.config.compile_model
+        quantize = not compile_model and self._should_quantize()
+        key = (model_name, str(self.device), compile_model, quantize)
+        recent = HarmonixSeparator._recent_models
+        
+        with HarmonixSeparator._model_cache_lock:
+            model = HarmonixSeparator._model_cache.get(key)
+            if model is not None:
+                logger.info(f"Reusing loaded model: {model_name}")
+            else:
+                logger.info(f"Loading model: {model_name}")
+                model = get_model(model_name)
+                model.to(self.device)
+                model.eval()
+                
+                if self.device.type == "cuda":
+                    # NHWC weights for the spectrogram branch's Conv2d layers, so
+                    # cuDNN picks its Tensor Core kernels. Only 4-D parameters
+                    # change; the 1-D waveform branch and the input are untouched
+                    model.to(memory_format=torch.channels_last)
+                
+                if compile_model:
+                    self._compile_model(model)
+                elif quantize:
+                    self._quantize_model(model)
+                
+                HarmonixSeparator._model_cache[key] = model
+            
+            recent[key] = model
+            recent.move_to_end(key)
+            while len(recent) > HarmonixSeparator.RECENT_MODELS:
+                recent.popitem(last=False)
+        return model
+    
+    def _compile_model(self, model):
+        """
+        Compile the forward pass of a model, or of each model in a bag
+        
+        forward is replaced on the instance instead of wrapping the module,
+        so the isinstance checks in demucs.apply still see the real class.
+        Falls back to eager mode if compilation fails.
+        """
+        import torch
+        
+        sub_models = list(getattr(model, 'models', [model]))
+        try:
+            for sub_model in sub_models:
+                sub_model.forward = torch.compile(sub_model.forward, mode="reduce-overhead")
+            
+            # Compile and record CUDA graphs now rather than on the first job.
+            # apply_model pads every window to the same valid length, so the
+            # graph captured for that shape is replayed for each window.
+            segment = self._params.get('segment')
+            with torch.inference_mode(), torch.autocast(
+                device_type=self.device.type,
+                dtype=self._amp_dtype,
+                enabled=self._amp_dtype is not None
+            ):
+                for sub_model in sub_models:
+                    length = int(sub_model.samplerate * (segment or sub_model.segment))
+                    if hasattr(sub_model, 'valid_length'):
+                        length = sub_model.valid_length(length)
+                    sub_model(torch.zeros(1, sub_model.audio_channels, length, device=self.device))
+            logger.info("Model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, running in eager mode: {e}")
+            for sub_model in sub_models:
+                sub_model.__dict__.pop('forward', None)
+    
+    def _should_quantize(self) -> bool:
+        """Whether to quantize the model for CPU inference"""
+        return (
+            self.config.quantize_cpu
+            and self.device.type == "cpu"
+            and self.config.quality != QualityMode.STUDIO
+            # ARM CPUs (Apple Silicon) are better served by FP32 on Accelerate
+            and platform.machine().lower() in ("x86_64", "amd64")
+        )
+    
+    def _quantize_model(self, model):
+        """
+        Quantize the Linear layers of a model to int8 in place
+        
+        Weights are stored as int8 and activations quantized on the fly.
+        Uses torchao when it is installed, otherwise the (deprecated)
+        torch.ao dynamic quantization on fbgemm. Either way the model keeps
+        its class for demucs.apply. Falls back to FP32 if quantization fails.
+        """
+        import torch
+        
+        try:
+            try:
+                from torchao.quantization import (
+                    Int8DynamicActivationInt8WeightConfig,
+                    quantize_,
+                )
+            except ImportError:
+                if "fbgemm" not in torch.backends.quantized.supported_engines:
+                    return
+                torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
+            else:
+                # Default filter only touches nn.Linear, like quantize_dynamic
+                quantize_(model, Int8DynamicActivationInt8WeightConfig())
+            logger.info("Model Linear layers quantized to int8 for CPU inference")
+        except Exception as e:
+            logger.warning(f"Dynamic quantization failed, running in FP32: {e}")
+    
     def _get_model_name(self) -> str:
         """Get Demucs model name based on quality setting"""
         quality_map = {
@@ -157,6 +384,26 @@ class HarmonixSeparator:
         }
         return quality_map[self.config.quality]
     
+    def _get_amp_dtype(self) -> Optional["torch.dtype"]:
+        """Get the autocast dtype for inference, or None for full FP32"""
+        import torch
+        
+        precision = self.config.precision
+        if precision == "fp32" or self.device.type == "cpu":
+            return None
+        if precision == "auto":
+            # Only on by default for CUDA; studio output stays full precision
+            if self.device.type != "cuda" or self.config.quality == QualityMode.STUDIO:
+                return None
+            return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        
+        # Explicit opt-in also covers MPS where this torch build can autocast it
+        is_available = getattr(torch.amp, "is_autocast_available", None)
+        if self.device.type == "mps" and not (is_available and is_available("mps")):
+            logger.warning(f"Autocast unsupported on MPS in torch {torch.__version__}, using FP32")
+            return None
+        return {"bf16": torch.bfloat16, "fp16": torch.float16}[precision]
+    
     def _get_separation_params(self) -> Dict:
         """Get separation parameters based on quality mode"""
         if self.config.quality == QualityMode.DRAFT:
@@ -199,8 +446,9 @@ class HarmonixSeparator:
         self, 
         audio_path: Union[str, Path],
         output_dir: Optional[Union[str, Path]] = None,
-        custom_name: Optional[str] = None
-    ) -> Dict[str, StemOutput]:
+        custom_name: Optional[str] = None,
+        device_lock: Optional[threading.Lock] = None
+    ) -> Mapping[str, StemOutput]:
         """
         Separate audio file into stems
         
@@ -208,6 +456,8 @@ class HarmonixSeparator:
             audio_path: Path to input audio file
             output_dir: Optional directory to save stems
             custom_name: Optional custom name for output files
+            device_lock: Held only while the device is in use, so another
+                job's inference can overlap this job's refinement and saving
             
         Returns:
             Dictionary mapping stem name to StemOutput
@@ -218,11 +468,17 @@ class HarmonixSeparator:
         
         logger.info(f"Starting separation: {audio_path.name}")
         
-        # Load audio
-        audio, sr = self._load_audio(audio_path)
-        
-        # Perform primary separation
-        stems = self._separate_primary(audio, sr)
+        with device_lock or nullcontext():
+            stream_info = self._stream_info(audio_path)
+            if stream_info is not None:
+                stems = self._separate_streaming(audio_path, stream_info)
+            else:
+                # Load audio
+                audio, sr = self._load_audio(audio_path)
+                
+                # Perform primary separation; stems come back in host memory
+                stems = self._separate_primary(audio, sr)
+                del audio
         
         # Handle different separation modes
         if self.config.mode == SeparationMode.KARAOKE:
@@ -240,7 +496,14 @@ class HarmonixSeparator:
         logger.info(f"Separation complete: {len(stems)} stems extracted")
         return stems
     
-    def _load_audio(self, path: Path) -> Tuple[torch.Tensor, int]:
+    def _target_sample_rate(self, native_sr: int) -> int:
+        """Get the rate a file is separated at"""
+        if self.config.preserve_sample_rate and native_sr >= 44100:
+            # Keep native rate if it's standard (44.1k, 48k, 88.2k, 96k)
+            return native_sr
+        return self.config.sample_rate
+    
+    def _load_audio(self, path: Path) -> Tuple["torch.Tensor", int]:
         """
         Load and preprocess audio file
         
@@ -255,55 +518,83 @@ class HarmonixSeparator:
         Returns:
             Tuple of (audio tensor, sample rate)
         """
+        import torch
+        
         try:
-            # First, get the native sample rate
-            import soundfile as sf
-            info = sf.info(str(path))
-            native_sr = info.samplerate
-            native_channels = info.channels
-            
-            logger.info(f"Source audio: {native_sr}Hz, {native_channels} channels, {info.subtype}")
+            # First, get the native sample rate. Formats libsndfile cannot
+            # open (e.g. M4A/AAC) are decoded up front, which reports it.
+            decoded = None
+            try:
+                info = sf.info(str(path))
+                native_sr = info.samplerate
+                logger.info(f"Source audio: {native_sr}Hz, {info.channels} channels, {info.subtype}")
+            except RuntimeError:
+                info = None
+                decoded, native_sr = self._decode_fallback(path)
+                logger.info(f"Source audio: {native_sr}Hz (decoded without libsndfile)")
             
             # Determine target sample rate
-            if self.config.preserve_sample_rate and native_sr >= 44100:
-                # Keep native rate if it's standard (44.1k, 48k, 88.2k, 96k)
-                target_sr = native_sr
+            target_sr = self._target_sample_rate(native_sr)
+            if target_sr == native_sr:
                 logger.info(f"Preserving native sample rate: {native_sr}Hz")
             else:
-                # Resample to config rate
-                target_sr = self.config.sample_rate
-                if target_sr != native_sr:
-                    logger.info(f"Resampling from {native_sr}Hz to {target_sr}Hz")
-            
-            # Load audio with target sample rate (None = native rate)
-            load_sr = target_sr if target_sr != native_sr else None
-            audio_np, sr = librosa.load(str(path), sr=load_sr, mono=False)
+                logger.info(f"Resampling from {native_sr}Hz to {target_sr}Hz")
             
-            # Update actual sample rate
-            if load_sr is None:
-                sr = native_sr
+            sr = target_sr
             
             # Store original sample rate for output
             self._original_sample_rate = sr
             
-            # PREVIEW MODE: Trim to preview_duration seconds
+            # PREVIEW MODE: Only the first preview_duration seconds are decoded
+            frames = -1
             if self.config.preview_mode:
-                max_samples = int(self.config.preview_duration * sr)
-                if audio_np.shape[-1] > max_samples:
-                    audio_np = audio_np[..., :max_samples]
-                    logger.info(f"Preview mode: Trimmed to {self.config.preview_duration}s ({max_samples} samples)")
+                frames = int(self.config.preview_duration * native_sr)
+                total_frames = info.frames if info is not None else decoded.shape[-1]
+                if total_frames > frames:
+                    logger.info(f"Preview mode: Trimmed to {self.config.preview_duration}s ({frames} samples)")
             
-            # Convert to tensor
-            if audio_np.ndim == 1:
-                audio_np = np.stack([audio_np, audio_np])  # Mono to stereo
-            audio = torch.from_numpy(audio_np).float()
+            # Load at the native rate; resampling happens on the device below
+            audio = None
+            if info is not None and self.config.low_memory:
+                try:
+                    # Straight from libsndfile, reading only the frames needed.
+                    # 16-bit PCM stays int16 until it reaches the device, which
+                    # halves the bytes held and copied; the float cast is exact.
+                    read_dtype = 'int16' if info.subtype == 'PCM_16' else 'float32'
+                    audio_np, _ = sf.read(str(path), frames=frames, dtype=read_dtype, always_2d=True)
+                    audio = torch.from_numpy(audio_np).T  # (channels, samples) view
+                except RuntimeError:
+                    logger.debug("libsndfile cannot decode this file, using the fallback decoder")
+            
+            if audio is None:
+                if decoded is None:
+                    decoded, _ = self._decode_fallback(path)
+                audio = decoded[:, :frames] if frames >= 0 else decoded
             
-            # Convert to stereo if mono
+            # Long inputs stay in host memory: apply_model then copies one
+            # window at a time to the device and accumulates the stems on the
+            # host, so device memory no longer grows with the file length
+            max_seconds = self.config.max_device_seconds
+            if max_seconds is not None and audio.shape[1] > max_seconds * native_sr:
+                if self.device.type != "cpu":
+                    logger.info(f"Input longer than {max_seconds}s, streaming windows to {self.device}")
+            elif self.device.type == "cuda":
+                # Pinned host memory lets the copy run asynchronously
+                audio = audio.pin_memory().to(self.device, non_blocking=True)
+            else:
+                audio = audio.to(self.device)
+            
+            # Scale to [-1, 1) the way soundfile's float reads do
+            if audio.dtype == torch.int16:
+                audio = audio.float().mul_(1 / 32768)
+            
+            # Convert to stereo if mono: a view of the single channel, so only
+            # one channel crosses to the device and nothing is duplicated
             if audio.shape[0] == 1:
-                audio = audio.repeat(2, 1)
+                audio = audio.expand(2, -1)
             
-            # Move to device
-            audio = audio.to(self.device)
+            if target_sr != native_sr:
+                audio = self._get_resampler(native_sr, target_sr, audio.device)(audio)
             
             duration = audio.shape[1] / sr
             logger.info(
@@ -317,11 +608,65 @@ class HarmonixSeparator:
             logger.error(f"Failed to load audio: {e}")
             raise
     
+    def _decode_fallback(self, path: Path) -> Tuple["torch.Tensor", int]:
+        """
+        Decode a file libsndfile cannot read (e.g. M4A/AAC)
+        
+        torchaudio decodes straight into a float32 (channels, samples)
+        tensor; librosa handles whatever torchaudio's backends cannot.
+        
+        Args:
+            path: Audio file path
+            
+        Returns:
+            Tuple of (audio tensor, native sample rate)
+        """
+        import torch
+        import torchaudio
+        
+        try:
+            return torchaudio.load(str(path), channels_first=True)
+        except Exception as e:
+            logger.debug(f"torchaudio cannot decode {path.name}, using librosa: {e}")
+        
+        import librosa
+        audio_np, sr = librosa.load(str(path), sr=None, mono=False)
+        return torch.from_numpy(np.atleast_2d(audio_np)), sr
+    
+    def _get_resampler(
+        self,
+        orig_sr: int,
+        target_sr: int,
+        device: "torch.device"
+    ) -> "torchaudio.transforms.Resample":
+        """Get a resampler for a rate pair, building its filter kernel once per device"""
+        import torchaudio
+        
+        key = (orig_sr, target_sr, device)
+        resampler = self._resamplers.get(key)
+        if resampler is None:
+            if self.config.quality in (QualityMode.DRAFT, QualityMode.FAST):
+                # Short Hann-windowed sinc, like torchaudio's default
+                resampler = torchaudio.transforms.Resample(orig_sr, target_sr)
+            else:
+                # Long Kaiser-windowed sinc (librosa's kaiser_best parameters)
+                resampler = torchaudio.transforms.Resample(
+                    orig_sr,
+                    target_sr,
+                    resampling_method="sinc_interp_kaiser",
+                    lowpass_filter_width=64,
+                    rolloff=0.9475937167399596,
+                    beta=14.769656459379492
+                )
+            resampler = resampler.to(device)
+            self._resamplers[key] = resampler
+        return resampler
+    
     def _separate_primary(
         self, 
-        audio: torch.Tensor, 
+        audio: "torch.Tensor", 
         sr: int
-    ) -> Dict[str, StemOutput]:
+    ) -> StemBundle:
         """
         Perform primary 4-stem separation using Demucs
         
@@ -330,60 +675,268 @@ class HarmonixSeparator:
             sr: Sample rate
             
         Returns:
-            Dictionary of stem outputs
+            Bundle of stem outputs
         """
+        import torch
+        
         quality_name = self.config.quality.value.upper()
         logger.info(f"Running {quality_name} quality separation")
         
         # Get quality-specific parameters
-        params = self._get_separation_params()
+        params = self._params
+        sources = self._run_model(audio, params)
+        
+        # Per-stem peak and RMS level, reduced on the device for all stems at
+        # once; max/min and the norm avoid a full-size |x| or x**2 temporary
+        levels = torch.stack([
+            torch.maximum(sources.amax(dim=(1, 2)), -sources.amin(dim=(1, 2))),
+            torch.linalg.vector_norm(sources, dim=(1, 2)) / (sources[0].numel() ** 0.5)
+        ])
+        
+        # Bring all stems to the host in one copy; each stem is a view of it
+        sources_np = self._to_host(sources).numpy()
+        peaks, rms_levels = levels.tolist()
         
-        with torch.no_grad():
+        stems = self._bundle(sources_np, sr, params, peaks, rms_levels)
+        logger.debug(f"Extracted stems: {stems.names} - {stems.audio.shape}")
+        
+        return stems
+    
+    def _run_model(self, audio: "torch.Tensor", params: Dict) -> "torch.Tensor":
+        """
+        Run the primary model over audio
+        
+        Args:
+            audio: Audio tensor [channels, samples]
+            params: Separation parameters for the quality mode
+            
+        Returns:
+            FP32 sources laid out [stems, samples, channels]
+        """
+        import torch
+        
+        amp_dtype = self._amp_dtype
+        with torch.inference_mode(), torch.autocast(
+            device_type=self.device.type,
+            dtype=amp_dtype,
+            enabled=amp_dtype is not None
+        ):
             # Add batch dimension
             audio_batch = audio.unsqueeze(0)
             
-            # Apply model with quality-specific settings
-            sources = self._apply_model(
-                self.models['primary'],
-                audio_batch,
+            # Apply model with quality-specific settings. apply_model keeps its
+            # overlap-add accumulator wherever audio lives: on the device
+            # normally, in host memory for inputs over max_device_seconds.
+            shifts = params.get('shifts', 1)
+            kwargs = dict(
                 device=self.device,
-                shifts=params.get('shifts', 1),
                 split=params.get('split', True),
                 overlap=params.get('overlap', 0.25),
                 segment=params.get('segment', self.config.segment_duration)
             )
+            if shifts > 1 and audio.device.type == "cuda":
+                sources = self._apply_shifted(audio_batch, shifts, **kwargs)
+            else:
+                sources = self._apply_model(
+                    self.models['primary'], audio_batch, shifts=shifts, **kwargs
+                )
             
-            # Remove batch dimension
-            sources = sources.squeeze(0)
+            # Remove batch dimension; mixed-precision output goes back to FP32.
+            # Laid out (stems, samples, channels), the frame-interleaved order
+            # soundfile writes, so the transpose happens once on the device
+            return sources.squeeze(0).transpose(1, 2).contiguous().float()
+    
+    def _apply_shifted(self, mix: "torch.Tensor", shifts: int, **kwargs) -> "torch.Tensor":
+        """
+        Run the shift trick with the shifted copies stacked in the batch
         
-        # Convert to stem outputs
-        stems = {}
-        source_names = self.models['primary'].sources
+        Equivalent to apply_model(..., shifts=shifts): the mix is padded by
+        half a second each side, every copy starts at a random offset into
+        the padding, and the outputs are realigned and averaged. Batching the
+        copies makes one pass over the track instead of one per shift. The
+        batch is capped by free VRAM and halved on out-of-memory.
         
-        for idx, name in enumerate(source_names):
-            # Convert to numpy
-            audio_np = sources[idx].cpu().numpy()
+        Args:
+            mix: Audio on the device [1, channels, samples]
+            shifts: Number of random shifts to average
+            **kwargs: Passed through to apply_model
             
-            stems[name] = StemOutput(
-                name=name,
-                audio=audio_np,
-                sample_rate=sr,
-                confidence=1.0,
-                metadata={
-                    'model': self._get_model_name(),
+        Returns:
+            Sources [1, stems, channels, samples]
+        """
+        import torch
+        import torch.nn.functional as F
+        
+        model = self.models['primary']
+        max_shift = int(0.5 * model.samplerate)
+        length = mix.shape[-1]
+        padded = F.pad(mix, (max_shift, max_shift))
+        offsets = [random.randint(0, max_shift) for _ in range(shifts)]
+        
+        # Each copy holds its input plus an accumulator and weighted output
+        # for every source in apply_model
+        copy_bytes = 2 * (len(model.sources) + 1) * mix.numel() * mix.element_size()
+        free_bytes, _ = torch.cuda.mem_get_info(mix.device)
+        batch = max(1, min(shifts, free_bytes // copy_bytes))
+        
+        out = None
+        start = 0
+        while start < shifts:
+            group = offsets[start:start + batch]
+            shifted = torch.cat([padded[..., off:off + length + max_shift] for off in group])
+            try:
+                res = self._apply_model(model, shifted, shifts=0, **kwargs)
+            except torch.cuda.OutOfMemoryError:
+                if batch == 1:
+                    raise
+                del shifted
+                torch.cuda.empty_cache()
+                batch = (batch + 1) // 2
+                logger.debug(f"Out of memory, retrying shifts in batches of {batch}")
+                continue
+            
+            for idx, off in enumerate(group):
+                aligned = res[idx:idx + 1, ..., max_shift - off:max_shift - off + length]
+                out = aligned.clone() if out is None else out.add_(aligned)
+            start += len(group)
+        
+        return out.div_(shifts)
+    
+    def _bundle(
+        self,
+        sources_np: np.ndarray,
+        sr: int,
+        params: Dict,
+        peaks: List[float],
+        rms_levels: List[float]
+    ) -> StemBundle:
+        """Wrap [stems, samples, channels] host audio as a StemBundle"""
+        # audio is a (stems, channels, samples) view whose per-stem .T is
+        # contiguous for writing
+        model_name = self._get_model_name()
+        return StemBundle(
+            names=list(self.models['primary'].sources),
+            audio=sources_np.transpose(0, 2, 1),
+            sample_rate=sr,
+            confidences=np.ones(len(sources_np), dtype=np.float32),
+            metadata=[
+                {
+                    'model': model_name,
                     'quality': self.config.quality.value,
                     'shifts': params.get('shifts', 1),
-                    'overlap': params.get('overlap', 0.25)
+                    'overlap': params.get('overlap', 0.25),
+                    'peak': peak,
+                    'rms': rms
                 }
-            )
+                for peak, rms in zip(peaks, rms_levels)
+            ]
+        )
+    
+    def _stream_info(self, path: Path) -> Optional["sf._SoundFileInfo"]:
+        """Get the header of a file to separate block by block, or None"""
+        threshold = self.config.stream_threshold_seconds
+        if threshold is None or self.config.preview_mode:
+            return None
+        try:
+            info = sf.info(str(path))
+        except RuntimeError:
+            return None
+        # Blocks are separated at the native rate; resampling needs the whole file
+        if info.duration <= threshold or self._target_sample_rate(info.samplerate) != info.samplerate:
+            return None
+        return info
+    
+    def _separate_streaming(self, path: Path, info: "sf._SoundFileInfo") -> StemBundle:
+        """
+        Separate a long file block by block with bounded memory
+        
+        Blocks of stream_block_seconds are read with soundfile, separated
+        on the device and cross-faded into a disk-backed memmap, so neither
+        host nor device memory grows with the length of the file.
+        
+        Args:
+            path: Audio file path
+            info: Header of the file
             
-            logger.debug(f"Extracted stem: {name} - {audio_np.shape}")
+        Returns:
+            Bundle of stem outputs backed by the memmap
+        """
+        import torch
         
-        return stems
+        sr = info.samplerate
+        self._original_sample_rate = sr
+        block = int(self.config.stream_block_seconds * sr)
+        overlap = int(self.STREAM_OVERLAP_SECONDS * sr)
+        n_sources = len(self.models['primary'].sources)
+        params = self._params
+        
+        logger.info(
+            f"Streaming {info.duration:.0f}s input in "
+            f"{self.config.stream_block_seconds}s blocks"
+        )
+        
+        # (stems, samples, channels) output in an already unlinked temp file;
+        # the mapping keeps it alive for as long as the stems are referenced
+        with tempfile.TemporaryFile() as backing:
+            out = np.memmap(backing, dtype=np.float32, mode='w+', shape=(n_sources, info.frames, 2))
+        fade_in = np.linspace(0.0, 1.0, overlap, dtype=np.float32)[:, None]
+        
+        start = 0
+        for block_np in sf.blocks(
+            str(path),
+            blocksize=block + overlap,
+            overlap=overlap,
+            dtype='float32',
+            always_2d=True
+        ):
+            audio = torch.from_numpy(block_np).T.to(self.device)
+            if audio.shape[0] == 1:
+                audio = audio.expand(2, -1)
+            sources = self._to_host(self._run_model(audio, params)).numpy()
+            
+            # Each block after the first re-reads the previous block's last
+            # `overlap` frames; cross-fade those into what is already written
+            length = sources.shape[1]
+            head = min(overlap, length) if start else 0
+            if head:
+                ramp = fade_in[:head]
+                region = out[:, start:start + head]
+                region *= 1 - ramp
+                region += sources[:, :head] * ramp
+            out[:, start + head:start + length] = sources[:, head:]
+            start += block
+        
+        # Levels in one sequential pass over the finished buffer
+        peaks = np.zeros(n_sources)
+        squares = np.zeros(n_sources)
+        for i in range(0, info.frames, block):
+            chunk = out[:, i:i + block]
+            peaks = np.maximum(peaks, np.maximum(chunk.max(axis=(1, 2)), -chunk.min(axis=(1, 2))))
+            squares += np.einsum('stc,stc->s', chunk, chunk)
+        rms_levels = np.sqrt(squares / max(out[0].size, 1))
+        
+        return self._bundle(out, sr, params, peaks.tolist(), rms_levels.tolist())
+    
+    def _to_host(self, tensor: "torch.Tensor") -> "torch.Tensor":
+        """
+        Copy a device tensor to host memory in a single transfer
+        
+        On CUDA the copy lands in pinned memory and runs asynchronously
+        until the final synchronize. A fresh buffer is taken per call
+        (torch caches pinned blocks) because returned stems keep views of it.
+        """
+        if tensor.device.type != "cuda":
+            return tensor.cpu()
+        import torch
+        
+        host = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+        host.copy_(tensor, non_blocking=True)
+        torch.cuda.current_stream(tensor.device).synchronize()
+        return host
     
     def _create_karaoke_stems(
         self,
-        stems: Dict[str, StemOutput]
+        stems: Mapping[str, StemOutput]
     ) -> Dict[str, StemOutput]:
         """
         Create karaoke 2-stem output: Vocals + Instrumental
@@ -415,22 +968,18 @@ class HarmonixSeparator:
                 sr = stems[key].sample_rate
         
         if instrumental_parts and sr:
-            # Mix all parts
+            # Sum all parts in place into one float32 buffer; shorter parts
+            # add into the head of it instead of being padded first. The
+            # buffer is frame-major like the primary stems, so the
+            # (channels, samples) view written out is contiguous once .T'd
             max_len = max(part.shape[-1] for part in instrumental_parts)
-            
-            # Pad if needed and sum
-            instrumental_mix = np.zeros_like(instrumental_parts[0])
-            if instrumental_mix.shape[-1] < max_len:
-                instrumental_mix = np.zeros((instrumental_parts[0].shape[0], max_len))
+            channels = instrumental_parts[0].shape[0]
+            mix_frames = np.zeros((max_len, channels), dtype=np.float32)
             
             for part in instrumental_parts:
-                if part.shape[-1] < max_len:
-                    # Pad
-                    padded = np.zeros((part.shape[0], max_len))
-                    padded[:, :part.shape[-1]] = part
-                    instrumental_mix += padded
-                else:
-                    instrumental_mix += part
+                head = mix_frames[:part.shape[-1]]
+                np.add(head, part.T, out=head)
+            instrumental_mix = mix_frames.T
             
             karaoke_stems["instrumental"] = StemOutput(
                 name="instrumental",
@@ -450,7 +999,7 @@ class HarmonixSeparator:
     
     def _refine_instruments(
         self, 
-        stems: Dict[str, StemOutput]
+        stems: Mapping[str, StemOutput]
     ) -> Dict[str, StemOutput]:
         """
         Refine 'other' stem into individual instruments
@@ -514,14 +1063,21 @@ class HarmonixSeparator:
         instruments = {}
         
         # Placeholder: Just duplicate 'other' for now
-        # Real implementation would use specialized models
+        # Real implementation would use specialized models. When it lands,
+        # query all instruments in one batched call (the 'other' stem
+        # expanded along a batch dim, one conditioning row per instrument)
+        # and split the result, rather than one model call per instrument.
+        # Until then every stem references the same array; nothing is copied.
+        # Read-only so no consumer can change one stem through another
+        audio.flags.writeable = False
         for instrument in target_instruments:
             instruments[instrument] = StemOutput(
                 name=instrument,
                 audio=audio,  # TODO: actual separation
                 sample_rate=sr,
                 confidence=0.5,  # Low confidence for heuristic
-                metadata={'method': 'heuristic_placeholder'}
+                metadata={'method': 'heuristic_placeholder'},
+                shared_id=id(audio)
             )
             logger.debug(f"Extracted (placeholder): {instrument}")
         
@@ -529,7 +1085,7 @@ class HarmonixSeparator:
     
     def _save_stems(
         self, 
-        stems: Dict[str, StemOutput],
+        stems: Mapping[str, StemOutput],
         output_dir: Union[str, Path],
         base_name: str
     ):
@@ -555,72 +1111,164 @@ class HarmonixSeparator:
         else:
             clean_name = base_name
         
+        # Stems sharing a buffer are encoded once and linked to the rest
+        unique: Dict[Union[int, str], Tuple[StemOutput, str]] = {}
+        links: List[Tuple[int, str]] = []
         for name, stem in stems.items():
-            # Determine output format based on config
-            output_format = getattr(self.config, 'output_format', 'mp3')
-            bit_depth = getattr(self.config, 'bit_depth', 24)
-            mp3_bitrate = getattr(self.config, 'mp3_bitrate', 320)
-            
-            # Map bit depth to soundfile subtype
-            bit_depth_map = {
-                16: 'PCM_16',
-                24: 'PCM_24',
-                32: 'FLOAT'
+            stem_name = f"{clean_name}_{name}"
+            key = name if stem.shared_id is None else stem.shared_id
+            if key in unique:
+                links.append((key, stem_name))
+            else:
+                unique[key] = (stem, stem_name)
+        
+        # libsndfile, LAME and ffmpeg all run outside the GIL, so stems
+        # encode in parallel, one worker per stem up to the core count
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(8, len(unique), os.cpu_count() or 1)),
+            thread_name_prefix="harmonix-save"
+        ) as executor:
+            futures = {
+                key: executor.submit(self._write_stem, stem, output_dir, stem_name)
+                for key, (stem, stem_name) in unique.items()
             }
-            subtype = bit_depth_map.get(bit_depth, 'PCM_24')
+            written = {key: future.result() for key, future in futures.items()}
+        
+        for key, stem_name in links:
+            source = written[key]
+            self._link_stem(source, output_dir / f"{stem_name}{source.suffix}")
+        
+        logger.info(f"All stems saved to: {output_dir}")
+    
+    def _write_stem(
+        self,
+        stem: StemOutput,
+        output_dir: Path,
+        stem_name: str
+    ) -> Path:
+        """
+        Encode one stem into output_dir
+        
+        Args:
+            stem: Stem to save
+            output_dir: Output directory
+            stem_name: Output filename without extension
             
-            if output_format == 'mp3':
-                # Save as MP3 (compressed)
-                mp3_path = output_dir / f"{clean_name}_{name}.mp3"
-                logger.info(f"Saving stem to: {mp3_path}")
-                
-                import tempfile
-                import subprocess
-                
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                    tmp_wav_path = tmp.name
-                
-                # Save temporary WAV at full quality
-                logger.debug(f"Writing temp WAV: {tmp_wav_path}")
-                sf.write(
-                    tmp_wav_path,
-                    stem.audio.T,
-                    stem.sample_rate,
-                    subtype=subtype
-                )
-                logger.debug(f"Temp WAV written, converting to MP3...")
-                
-                # Convert to MP3 using ffmpeg with timeout
-                try:
-                    subprocess.run([
-                        'ffmpeg', '-y', '-loglevel', 'quiet', '-i', tmp_wav_path,
-                        '-codec:a', 'libmp3lame',
-                        '-b:a', f'{mp3_bitrate}k',
-                        '-q:a', '0',
-                        str(mp3_path)
-                    ], check=True, capture_output=True, timeout=300, stdin=subprocess.DEVNULL)
-                    
-                    Path(tmp_wav_path).unlink()
-                    logger.info(f"Saved MP3 ({mp3_bitrate}kbps): {mp3_path}")
-                except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                    logger.warning(f"FFmpeg not available, saving as WAV: {e}")
-                    wav_path = output_dir / f"{clean_name}_{name}.wav"
-                    Path(tmp_wav_path).rename(wav_path)
-            else:
-                # Save as lossless WAV (default - best quality)
-                wav_path = output_dir / f"{clean_name}_{name}.wav"
-                
-                # Save with full quality
-                sf.write(
-                    str(wav_path),
-                    stem.audio.T,  # Transpose to (samples, channels)
-                    stem.sample_rate,
-                    subtype=subtype  # 24-bit by default for studio quality
+        Returns:
+            Path of the file written
+        """
+        # Determine output format based on config
+        output_format = getattr(self.config, 'output_format', 'mp3')
+        bit_depth = getattr(self.config, 'bit_depth', 24)
+        mp3_bitrate = getattr(self.config, 'mp3_bitrate', 320)
+        
+        # Map bit depth to soundfile subtype
+        bit_depth_map = {
+            16: 'PCM_16',
+            24: 'PCM_24',
+            32: 'FLOAT'
+        }
+        subtype = bit_depth_map.get(bit_depth, 'PCM_24')
+        
+        # Silent stems (bass on an a cappella, vocals on an instrumental)
+        # aren't worth a full-length encode; the primary stems' peak was
+        # already measured on the device
+        if self.config.skip_silent_stems and stem.audio.shape[-1] > stem.sample_rate:
+            peak = (stem.metadata or {}).get('peak')
+            if peak is None:
+                peak = max(float(stem.audio.max()), -float(stem.audio.min()))
+            if peak < self.SILENCE_PEAK:
+                logger.info(f"{stem_name} is silent (peak {peak:.1e}), saving a 1s placeholder")
+                silence = np.zeros((stem.sample_rate, stem.audio.shape[0]), dtype=np.float32)
+                stem = replace(stem, audio=silence.T)
+        
+        if output_format == 'mp3':
+            # Save as MP3 (compressed)
+            mp3_path = output_dir / f"{stem_name}.mp3"
+            logger.info(f"Saving stem to: {mp3_path}")
+            
+            import subprocess
+            
+            # stem.audio.T is the frame-major buffer, so this is a view, not a copy
+            frames = np.ascontiguousarray(stem.audio.T, dtype=np.float32)
+            
+            # Encode in process with lameenc (installed with demucs) when
+            # available, skipping the ffmpeg process and pipe
+            try:
+                import lameenc
+            except ImportError:
+                lameenc = None
+            if lameenc is not None:
+                encoder = lameenc.Encoder()
+                encoder.set_bit_rate(mp3_bitrate)
+                encoder.set_in_sample_rate(stem.sample_rate)
+                encoder.set_channels(frames.shape[1])
+                encoder.set_quality(2)
+                mp3_path.write_bytes(
+                    encoder.encode(_to_int16(frames).tobytes()) + encoder.flush()
                 )
+                logger.info(f"Saved MP3 ({mp3_bitrate}kbps): {mp3_path}")
+                return mp3_path
+            
+            # Otherwise stream raw float32 frames into ffmpeg's stdin rather
+            # than writing and re-reading a temporary WAV
+            try:
+                subprocess.run([
+                    'ffmpeg', '-y', '-loglevel', 'quiet',
+                    '-f', 'f32le', '-ar', str(stem.sample_rate),
+                    '-ac', str(frames.shape[1]), '-i', 'pipe:0',
+                    '-codec:a', 'libmp3lame',
+                    '-b:a', f'{mp3_bitrate}k',
+                    '-q:a', '0',
+                    str(mp3_path)
+                ], input=memoryview(frames).cast('B'), check=True,
+                    capture_output=True, timeout=300)
                 
-                logger.debug(f"Saved lossless WAV ({bit_depth}-bit, {stem.sample_rate}Hz): {wav_path}")
-        
-        logger.info(f"All stems saved to: {output_dir}")
+                logger.info(f"Saved MP3 ({mp3_bitrate}kbps): {mp3_path}")
+                return mp3_path
+            except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                logger.warning(f"FFmpeg not available, saving as WAV: {e}")
+                mp3_path.unlink(missing_ok=True)
+                wav_path = output_dir / f"{stem_name}.wav"
+                sf.write(str(wav_path), frames, stem.sample_rate, subtype=subtype)
+                return wav_path
+        elif output_format == 'flac':
+            # Lossless and about half the size of WAV; FLAC has no float subtype
+            flac_path = output_dir / f"{stem_name}.flac"
+            sf.write(
+                str(flac_path),
+                stem.audio.T,
+                stem.sample_rate,
+                format='FLAC',
+                subtype='PCM_16' if bit_depth == 16 else 'PCM_24'
+            )
+            
+            logger.debug(f"Saved FLAC ({stem.sample_rate}Hz): {flac_path}")
+            return flac_path
+        else:
+            # Save as lossless WAV (default - best quality)
+            wav_path = output_dir / f"{stem_name}.wav"
+            
+            # Save with full quality
+            sf.write(
+                str(wav_path),
+                stem.audio.T,  # Transpose to (samples, channels)
+                stem.sample_rate,
+                subtype=subtype  # 24-bit by default for studio quality
+            )
+            
+            logger.debug(f"Saved lossless WAV ({bit_depth}-bit, {stem.sample_rate}Hz): {wav_path}")
+            return wav_path
+    
+    @staticmethod
+    def _link_stem(source: Path, target: Path):
+        """Hard-link an already written stem file, copying where links are unsupported"""
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        logger.debug(f"Linked shared stem: {target} -> {source}")
     
     def get_available_models(self) -> Dict[str, any]:
         """
@@ -671,7 +1319,7 @@ class HarmonixSeparator:
         base_time = audio_duration * ratios[self.config.quality]
         
         # Add overhead for TTA shifts in studio mode
-        params = self._get_separation_params()
+        params = self._params
         shifts = params.get('shifts', 1)
         if shifts > 1:
             base_time *= (1 + (shifts - 1) * 0.3)  # Each shift adds ~30%
@@ -699,16 +1347,13 @@ class HarmonixSeparator:
     
     def _format_time(self, seconds: float) -> str:
         """Format seconds into human readable string"""
+        seconds = int(seconds)
         if seconds < 60:
-            return f"{int(seconds)}s"
+            return f"{seconds}s"
         elif seconds < 3600:
-            mins = int(seconds // 60)
-            secs = int(seconds % 60)
-            return f"{mins}m {secs}s"
+            return f"{seconds // 60}m {seconds % 60}s"
         else:
-            hours = int(seconds // 3600)
-            mins = int((seconds % 3600) // 60)
-            return f"{hours}h {mins}m"
+            return f"{seconds // 3600}h {seconds % 3600 // 60}m"
 
 
 def create_separator(
@@ -10,12 +10,14 @@ import json
 import time
 import secrets
 import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, url_for, session, redirect, flash
+from flask import Flask, Request, render_template, request, jsonify, send_file, send_from_directory, url_for, session, redirect, flash
 from werkzeug.utils import secure_filename
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional imports - may not be available in lite deployment
 try:
@@ -49,6 +51,8 @@ from harmonix_splitter.config.settings import Settings
 
 # Import shared library module
 from harmonix_splitter import library as shared_library
+from harmonix_splitter import db
+from harmonix_splitter.jobs import JobStorage, mark_interrupted_jobs
 
 
 def get_ytdlp_path():
@@ -65,13 +69,53 @@ def get_ytdlp_path():
     return 'yt-dlp'
 
 
+class UploadRequest(Request):
+    """
+    Request that spools uploaded files to disk next to their destination
+    
+    Werkzeug buffers file parts in memory, then in a temporary file under
+    the system temp dir, and FileStorage.save copies that into place. Files
+    spooled into UPLOAD_DIR instead can be hard-linked to their final path
+    by save_upload, so each upload is written to disk once.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, prefix='.upload-', buffering=UPLOAD_BUFFER_SIZE)
+
+
+# Uploads are hundreds of MB; write them in large blocks rather than
+# the 8-16KB defaults, so each one takes a few hundred write() calls
+UPLOAD_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def save_upload(file, path: Path):
+    """Move an uploaded file to path, linking the spooled upload when possible"""
+    spooled = getattr(file.stream, 'name', None)
+    if isinstance(spooled, str):
+        try:
+            file.stream.flush()
+            os.link(spooled, path)
+            return
+        except OSError:
+            pass
+    with open(path, 'wb', buffering=0) as dst:
+        shutil.copyfileobj(file.stream, dst, UPLOAD_BUFFER_SIZE)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = 'harmonix-secret-key-change-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
 
 
+@app.teardown_request
+def flush_batched_writes(exc):
+    """Apply batched database writes before the request completes"""
+    db.batcher.flush()
+
+
 @app.context_processor
 def inject_user():
     """Inject current_user into all templates"""
@@ -106,10 +150,57 @@ OUTPUT_DIR = settings.get_output_dir()
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Job storage (in-memory for now)
-jobs_storage = {}
+# Job storage (persisted to SQLite, bounded in memory). The store is
+# thread-safe on its own, so plain lookups skip jobs_lock; the lock only
+# serializes check-then-update sequences against each other.
+jobs_storage = JobStorage(settings.max_jobs_in_memory)
 jobs_lock = threading.Lock()
 
+# Separation jobs run on a fixed pool sized to what the GPU/CPU can
+# actually run at once; uploads beyond the backlog limit get a 429.
+JOB_QUEUE_FACTOR = 4  # Jobs accepted per worker, running or waiting
+JOB_RETRY_AFTER = 30  # Seconds clients are asked to wait when full
+job_executor = ThreadPoolExecutor(max_workers=settings.max_concurrent_jobs,
+                                  thread_name_prefix='harmonix-job')
+job_slots = threading.BoundedSemaphore(settings.max_concurrent_jobs * JOB_QUEUE_FACTOR)
+
+
+def reserve_job_slot() -> bool:
+    """Claim room for one more job without blocking; False if the backlog is full"""
+    return job_slots.acquire(blocking=False)
+
+
+def submit_job(fn, *args):
+    """Run a job on the worker pool, freeing its reserved slot when it ends"""
+    future = job_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: job_slots.release())
+    return future
+
+
+def server_busy_response():
+    """429 response for uploads arriving while the job backlog is full"""
+    response = jsonify({
+        'error': 'The server is busy processing other songs. Please try again shortly.',
+        'busy': True
+    })
+    response.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+    return response, 429
+
+# Orchestrators shared by all jobs, so separators and their loaded models
+# stay warm between uploads; keyed by preview mode
+orchestrators = {}
+orchestrators_lock = threading.Lock()
+
+
+def get_orchestrator(preview_mode: bool = False):
+    """Get the shared orchestrator for full or preview processing"""
+    with orchestrators_lock:
+        orchestrator = orchestrators.get(preview_mode)
+        if orchestrator is None:
+            orchestrator = create_orchestrator(auto_route=True, preview_mode=preview_mode)
+            orchestrators[preview_mode] = orchestrator
+        return orchestrator
+
 # Batch queue storage
 batch_queues = {}  # username -> list of pending jobs
 batch_queue_lock = threading.Lock()
@@ -200,8 +291,10 @@ def scan_existing_outputs(username: str | None = None):
                 
             job_id = job_dir.name
             
-            # Skip if already in storage AND has stems populated
-            if job_id in jobs_storage and jobs_storage[job_id].get('stems'):
+            # Skip if already in storage AND has stems populated (get() also
+            # loads the stored record, so it isn't replaced by a bare one)
+            stored_job = jobs_storage.get(job_id)
+            if stored_job is not None and stored_job.get('stems'):
                 continue
             
             # Find stem files (exclude pitch-shifted cache files and lyrics files)
@@ -357,8 +450,8 @@ def process_audio_async(job_id, audio_path, quality, mode, instruments, display_
         
         logger.info(f"Job {job_id}: Starting {quality} quality separation")
         
-        # Create orchestrator
-        orchestrator = create_orchestrator(auto_route=True)
+        # Get the shared orchestrator (models stay loaded between jobs)
+        orchestrator = get_orchestrator()
         
         with jobs_lock:
             jobs_storage[job_id]['progress'] = 30
@@ -381,24 +474,14 @@ def process_audio_async(job_id, audio_path, quality, mode, instruments, display_
         if result.status == "completed":
             # Prepare stem URLs - use display_name if provided, else original filename
             base_name = display_name if display_name else Path(audio_path).stem
-            stem_urls = {}
-            for stem_name in result.stems.keys():
-                # Check for MP3 first, then WAV
-                stem_file = user_output_dir / job_id / f"{base_name}_{stem_name}.mp3"
-                if not stem_file.exists():
-                    stem_file = user_output_dir / job_id / f"{base_name}_{stem_name}.wav"
-                if stem_file.exists():
-                    stem_urls[stem_name] = f"/download/{job_id}/{stem_name}"
+            job_dir = user_output_dir / job_id
+            saved_stems = find_saved_stems(job_dir, base_name, result.stems)
             
             # If no stems found with display_name, try original filename
-            if not stem_urls:
-                original_base = Path(audio_path).stem
-                for stem_name in result.stems.keys():
-                    stem_file = user_output_dir / job_id / f"{original_base}_{stem_name}.mp3"
-                    if not stem_file.exists():
-                        stem_file = user_output_dir / job_id / f"{original_base}_{stem_name}.wav"
-                    if stem_file.exists():
-                        stem_urls[stem_name] = f"/download/{job_id}/{stem_name}"
+            if not saved_stems:
+                saved_stems = find_saved_stems(job_dir, Path(audio_path).stem, result.stems)
+            
+            stem_urls = {stem_name: f"/download/{job_id}/{stem_name}" for stem_name in saved_stems}
             
             with jobs_lock:
                 jobs_storage[job_id].update({
@@ -851,6 +934,7 @@ def admin_backup():
     """Create and download backup ZIP file"""
     import zipfile
     import io
+    import tempfile
     from datetime import datetime
     
     if 'user_id' not in session or session.get('user_role') != 'admin':
@@ -864,10 +948,11 @@ def admin_backup():
         memory_file = io.BytesIO()
         
         with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-            # Add users.json
-            users_file = DATA_DIR / 'users.json'
-            if users_file.exists():
-                zf.write(users_file, 'data/users.json')
+            # Add a consistent snapshot of the user database
+            from harmonix_splitter.db import backup_database
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                snapshot = backup_database(Path(tmp_dir) / 'harmonix.db')
+                zf.write(snapshot, 'data/harmonix.db')
             
             # Add config
             config_dir = BASE_DIR.parent.parent.parent / 'config'
@@ -1315,7 +1400,7 @@ def process_batch_import():
                 shutil.copy2(audio_file, original_dest)
                 
                 # Step 3: Process stems (karaoke mode gives instrumental + vocals)
-                orchestrator = create_orchestrator(auto_route=True)
+                orchestrator = get_orchestrator()
                 
                 # Note: orchestrator creates a subfolder with job_id, so pass parent directory
                 result = orchestrator.process(
@@ -1358,13 +1443,7 @@ def process_batch_import():
                 
                 # Step 5: Save metadata - find stems with clean_title naming
                 stems_list = ['original']  # Original is always there
-                for stem_name in result.stems.keys():
-                    # Verify the stem file exists
-                    stem_file = library_path / f"{clean_title}_{stem_name}.mp3"
-                    if not stem_file.exists():
-                        stem_file = library_path / f"{clean_title}_{stem_name}.wav"
-                    if stem_file.exists():
-                        stems_list.append(stem_name)
+                stems_list += find_saved_stems(library_path, clean_title, result.stems)
                 
                 metadata = {
                     'youtube_id': video_id,
@@ -1630,7 +1709,7 @@ def account():
             'type': act.get('type', 'unknown'),
             'description': act.get('description', ''),
             'timestamp': act.get('timestamp', ''),
-            'time_ago': format_time_ago(act.get('timestamp', '')),
+            'time_ago': format_time_ago(act.get('ts') or act.get('timestamp', '')),
             'icon': get_activity_icon(act.get('type', '')),
             'metadata': act.get('metadata', {})
         })
@@ -1669,7 +1748,7 @@ def get_activities():
             'type': act.get('type', 'unknown'),
             'description': act.get('description', ''),
             'timestamp': act.get('timestamp', ''),
-            'time_ago': format_time_ago(act.get('timestamp', '')),
+            'time_ago': format_time_ago(act.get('ts') or act.get('timestamp', '')),
             'icon': get_activity_icon(act.get('type', '')),
             'metadata': act.get('metadata', {})
         })
@@ -1877,6 +1956,7 @@ def delete_account():
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Handle file upload and start processing"""
+    slot_reserved = False
     try:
         # Check if file is present
         if 'file' not in request.files:
@@ -1938,10 +2018,14 @@ def upload_file():
         # Use custom output name if provided, otherwise use original filename
         display_name = secure_filename(output_name) if output_name else base_name
         
+        if not reserve_job_slot():
+            return server_busy_response()
+        slot_reserved = True
+        
         # Create the upload path in user-specific directory
         user_upload_dir = get_user_upload_dir(username)
         upload_path = user_upload_dir / f"{job_id}_{base_name}{file_ext}"
-        file.save(str(upload_path))
+        save_upload(file, upload_path)
         
         logger.info(f"Job {job_id}: File uploaded by {username or 'anonymous'} - {base_name}{file_ext} (output as: {display_name})")
         
@@ -1965,13 +2049,10 @@ def upload_file():
                 'created_at': datetime.now().isoformat()
             }
         
-        # Start background processing with username for user-specific output
-        thread = threading.Thread(
-            target=process_audio_async,
-            args=(job_id, upload_path, quality, mode, instruments, display_name, username)
-        )
-        thread.daemon = True
-        thread.start()
+        # Queue background processing with username for user-specific output
+        submit_job(process_audio_async, job_id, upload_path, quality, mode,
+                   instruments, display_name, username)
+        slot_reserved = False
         
         return jsonify({
             'job_id': job_id,
@@ -1980,6 +2061,8 @@ def upload_file():
         })
         
     except Exception as e:
+        if slot_reserved:
+            job_slots.release()
         logger.error(f"Upload failed: {e}")
         return jsonify({'error': str(e)}), 500
 
@@ -2008,7 +2091,7 @@ def convert_to_midi():
             # Save uploaded file temporarily
             original_name = Path(audio_file.filename).stem
             temp_audio_path = UPLOAD_DIR / f"midi_temp_{uuid.uuid4().hex}{Path(audio_file.filename).suffix}"
-            audio_file.save(str(temp_audio_path))
+            save_upload(audio_file, temp_audio_path)
             cleanup_temp = True
         elif youtube_url:
             # Download from YouTube/URL
@@ -2410,6 +2493,7 @@ def validate_url():
 @app.route('/upload-url', methods=['POST'])
 def upload_from_url():
     """Download audio from YouTube/URL and start processing"""
+    slot_reserved = False
     try:
         data = request.get_json()
         url = data.get('url', '').strip()
@@ -2524,6 +2608,10 @@ def upload_from_url():
             allowed_stems = plan_info.get('stem_types', ['vocals', 'drums', 'bass', 'other'])
             instruments = [i for i in requested_instruments if i in allowed_stems]
         
+        if not reserve_job_slot():
+            return server_busy_response()
+        slot_reserved = True
+        
         # Generate job ID
         job_id = str(uuid.uuid4())
         
@@ -2555,13 +2643,10 @@ def upload_from_url():
                 'created_at': datetime.now().isoformat()
             }
         
-        # Start background download and processing with username
-        thread = threading.Thread(
-            target=download_and_process_url,
-            args=(job_id, url, quality, mode, instruments, output_name, username, preview_mode)
-        )
-        thread.daemon = True
-        thread.start()
+        # Queue background download and processing with username
+        submit_job(download_and_process_url, job_id, url, quality, mode,
+                   instruments, output_name, username, preview_mode)
+        slot_reserved = False
         
         preview_msg = " (30s preview)" if preview_mode else ""
         return jsonify({
@@ -2571,6 +2656,8 @@ def upload_from_url():
         })
         
     except Exception as e:
+        if slot_reserved:
+            job_slots.release()
         logger.error(f"URL upload failed: {e}")
         return jsonify({'error': str(e)}), 500
 
@@ -2716,8 +2803,11 @@ def process_batch_queue(username):
                         'created_at': datetime.now().isoformat()
                     }
                 
-                # Process the URL
-                download_and_process_url(job_id, url, quality, mode, None, None, username, False)
+                # Process the URL on the shared pool so batches respect
+                # the same concurrency cap as single uploads
+                job_executor.submit(
+                    download_and_process_url, job_id, url, quality, mode, None, None, username, False
+                ).result()
                 
             except Exception as e:
                 logger.error(f"Batch job failed: {job['url']} - {e}")
@@ -2953,8 +3043,8 @@ def process_downloaded_audio(job_id, audio_path, quality, mode, instruments, dis
         
         logger.info(f"Job {job_id}: Starting {actual_quality} quality separation{preview_label}")
         
-        # Create orchestrator with preview mode support
-        orchestrator = create_orchestrator(auto_route=True, preview_mode=preview_mode)
+        # Get the shared orchestrator with preview mode support
+        orchestrator = get_orchestrator(preview_mode)
         
         with jobs_lock:
             jobs_storage[job_id]['progress'] = 30
@@ -2995,16 +3085,11 @@ def process_downloaded_audio(job_id, audio_path, quality, mode, instruments, dis
             # Prepare stem URLs - different for library vs user storage
             stem_urls = {}
             
-            for stem_name in result.stems.keys():
-                # Check for WAV first (lossless), then MP3
-                stem_file = job_dir / f"{display_name}_{stem_name}.wav"
-                if not stem_file.exists():
-                    stem_file = job_dir / f"{display_name}_{stem_name}.mp3"
-                if stem_file.exists():
-                    if youtube_video_id:
-                        stem_urls[stem_name] = f"/library/{youtube_video_id}/{stem_name}"
-                    else:
-                        stem_urls[stem_name] = f"/download/{job_id}/{stem_name}"
+            for stem_name in find_saved_stems(job_dir, display_name, result.stems):
+                if youtube_video_id:
+                    stem_urls[stem_name] = f"/library/{youtube_video_id}/{stem_name}"
+                else:
+                    stem_urls[stem_name] = f"/download/{job_id}/{stem_name}"
             
             # Add original audio as a "stem"
             original_files = list(job_dir.glob(f"*_original.*"))
@@ -3077,8 +3162,7 @@ def get_status(job_id):
     username = session.get('user_id')
     user_role = session.get('user_role')
     
-    with jobs_lock:
-        job = jobs_storage.get(job_id)
+    job = jobs_storage.get(job_id)
     
     if not job:
         return jsonify({'error': 'Job not found'}), 404
@@ -3090,6 +3174,65 @@ def get_status(job_id):
     return jsonify(job)
 
 
+# Stored stem formats, in the order served when none is requested
+STEM_FORMATS = {'mp3': 'audio/mpeg', 'wav': 'audio/wav'}
+STEM_MAX_AGE = 86400  # Stems of a finished job never change
+
+
+def find_stem_file(stem_dir, stem_name):
+    """
+    Find the stored file for a stem, honoring an optional ?format= choice
+    
+    Returns:
+        (path, mimetype), or None if there is no stored file to serve
+    """
+    fmt = request.args.get('format')
+    for ext in ([fmt] if fmt else STEM_FORMATS):
+        if ext not in STEM_FORMATS:
+            break
+        stem_files = list(stem_dir.glob(f"*_{stem_name}.{ext}"))
+        if stem_files:
+            return stem_files[0], STEM_FORMATS[ext]
+    return None
+
+
+def find_saved_stems(stem_dir, base_name, stem_names):
+    """
+    Names of the stems saved in stem_dir as <base_name>_<stem>.mp3/.wav
+    
+    Reads the directory once instead of stat-ing each candidate file.
+    """
+    try:
+        with os.scandir(stem_dir) as entries:
+            files = {entry.name for entry in entries}
+    except OSError:
+        return []
+    return [stem_name for stem_name in stem_names
+            if any(f"{base_name}_{stem_name}.{ext}" in files for ext in STEM_FORMATS)]
+
+
+def send_stem_file(stem_file, mimetype):
+    """
+    Stream a stored stem as-is
+    
+    Conditional and range requests are answered from the file's ETag and
+    mtime, so players can seek and revalidate without re-downloading.
+    """
+    response = send_file(
+        stem_file,
+        as_attachment=False,  # Allow streaming for player
+        download_name=stem_file.name,
+        mimetype=mimetype,
+        conditional=True,
+        etag=True,
+        max_age=STEM_MAX_AGE
+    )
+    # Stems are access-checked per user, so keep them out of shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
 @app.route('/download/<job_id>/<stem_name>')
 def download_stem(job_id, stem_name):
     """Download a specific stem - serves MP3 by default for smaller files"""
@@ -3097,8 +3240,7 @@ def download_stem(job_id, stem_name):
     user_role = session.get('user_role')
     
     # Get job info to determine owner
-    with jobs_lock:
-        job = jobs_storage.get(job_id)
+    job = jobs_storage.get(job_id)
     
     # Check ownership if job exists in storage (admin can access any)
     if job and user_role != 'admin' and job.get('user') != username:
@@ -3134,18 +3276,10 @@ def download_stem(job_id, stem_name):
         return jsonify({'error': 'Original audio not found'}), 404
     
     # Find stem file - prefer MP3 (compressed, faster to load) over WAV
-    stem_files = list(job_dir.glob(f"*_{stem_name}.mp3"))
-    mimetype = 'audio/mpeg'
-    
-    if not stem_files:
-        # Fallback to WAV if MP3 not found
-        stem_files = list(job_dir.glob(f"*_{stem_name}.wav"))
-        mimetype = 'audio/wav'
-    
-    if not stem_files:
+    found = find_stem_file(job_dir, stem_name)
+    if found is None:
         return jsonify({'error': f'Stem file not found: {stem_name}'}), 404
-    
-    stem_file = stem_files[0]
+    stem_file, mimetype = found
     
     # Log the file being served for debugging
     logger.debug(f"Serving stem: {stem_file.name} ({stem_file.stat().st_size / 1024 / 1024:.1f} MB)")
@@ -3159,12 +3293,7 @@ def download_stem(job_id, stem_name):
             'file_size': stem_file.stat().st_size
         })
     
-    return send_file(
-        stem_file,
-        as_attachment=False,  # Allow streaming for player
-        download_name=stem_file.name,
-        mimetype=mimetype
-    )
+    return send_stem_file(stem_file, mimetype)
 
 
 @app.route('/library/<youtube_id>/<stem_name>')
@@ -3201,17 +3330,10 @@ def download_library_stem(youtube_id, stem_name):
         return jsonify({'error': 'Original audio not found'}), 404
     
     # Find stem file - prefer MP3 over WAV
-    stem_files = list(library_dir.glob(f"*_{stem_name}.mp3"))
-    mimetype = 'audio/mpeg'
-    
-    if not stem_files:
-        stem_files = list(library_dir.glob(f"*_{stem_name}.wav"))
-        mimetype = 'audio/wav'
-    
-    if not stem_files:
+    found = find_stem_file(library_dir, stem_name)
+    if found is None:
         return jsonify({'error': f'Stem file not found: {stem_name}'}), 404
-    
-    stem_file = stem_files[0]
+    stem_file, mimetype = found
     
     # Log download activity
     if username and request.args.get('download') == 'true':
@@ -3222,12 +3344,7 @@ def download_library_stem(youtube_id, stem_name):
             'file_size': stem_file.stat().st_size
         })
     
-    return send_file(
-        stem_file,
-        as_attachment=False,
-        download_name=stem_file.name,
-        mimetype=mimetype
-    )
+    return send_stem_file(stem_file, mimetype)
 
 
 @app.route('/job/<job_id>/report')
@@ -3236,14 +3353,13 @@ def get_job_report(job_id):
     username = session.get('user_id')
     user_role = session.get('user_role')
     
-    with jobs_lock:
-        job = jobs_storage.get(job_id)
-        if not job:
-            return jsonify({'error': 'Job not found'}), 404
-        
-        # Check ownership (admin can view any)
-        if user_role != 'admin' and job.get('user') != username:
-            return jsonify({'error': 'Access denied'}), 403
+    job = jobs_storage.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Check ownership (admin can view any)
+    if user_role != 'admin' and job.get('user') != username:
+        return jsonify({'error': 'Access denied'}), 403
     
     # Get user-specific output directory
     job_owner = job.get('user')
@@ -3323,6 +3439,9 @@ def list_jobs():
     # Re-scan outputs for current user to catch any new files
     scan_existing_outputs(username)
     
+    # Pick up jobs started or updated by other worker processes
+    jobs_storage.refresh(username, limit=50, all_users=user_role == 'admin')
+    
     # Also load library links for the user
     if username:
         user_links = shared_library.get_user_library_links(username)
@@ -3356,14 +3475,13 @@ def list_jobs():
                             'source_url': library_metadata.get('source_url', f'https://youtube.com/watch?v={youtube_id}')
                         }
     
-    with jobs_lock:
-        # Filter jobs to only show user's own jobs (admin sees all)
-        if user_role == 'admin':
-            jobs = list(jobs_storage.values())
-        else:
-            jobs = [job for job in jobs_storage.values() 
-                    if job.get('user') == username or 
-                    (job.get('user') is None and username is None)]
+    # Filter jobs to only show user's own jobs (admin sees all)
+    if user_role == 'admin':
+        jobs = jobs_storage.values()
+    else:
+        jobs = [job for job in jobs_storage.values() 
+                if job.get('user') == username or 
+                (job.get('user') is None and username is None)]
     
     # Sort by creation time (newest first)
     jobs.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -3426,11 +3544,10 @@ def get_active_jobs():
     if user_role != 'admin':
         return jsonify({'error': 'Admin access required'}), 403
     
-    with jobs_lock:
-        active_jobs = [
-            job for job in jobs_storage.values()
-            if job.get('status') in ['processing', 'queued', 'downloading', 'analyzing', 'cancelling']
-        ]
+    active_jobs = [
+        job for job in jobs_storage.values()
+        if job.get('status') in ['processing', 'queued', 'downloading', 'analyzing', 'cancelling']
+    ]
     
     return jsonify({
         'jobs': active_jobs,
@@ -3596,7 +3713,7 @@ def analyze_audio():
         # Save temporarily for analysis
         filename = file.filename or 'unknown.wav'
         temp_path = UPLOAD_DIR / f"analyze_{uuid.uuid4()}{Path(filename).suffix}"
-        file.save(str(temp_path))
+        save_upload(file, temp_path)
         
         try:
             # Get audio duration
@@ -3699,16 +3816,15 @@ def analyze_job(job_id):
     """Get music analysis for an existing job"""
     try:
         # Check if job has cached analysis
-        with jobs_lock:
-            job = jobs_storage.get(job_id)
-            if job and 'music_info' in job:
-                # Return cached analysis
-                music_info = job['music_info']
-                return jsonify({
-                    'tempo': music_info.get('tempo'),
-                    'key': music_info.get('key'),
-                    'time_signature': {'time_signature': '4/4'}  # Default for cached
-                })
+        job = jobs_storage.get(job_id)
+        if job and 'music_info' in job:
+            # Return cached analysis
+            music_info = job['music_info']
+            return jsonify({
+                'tempo': music_info.get('tempo'),
+                'key': music_info.get('key'),
+                'time_signature': {'time_signature': '4/4'}  # Default for cached
+            })
         
         # Find audio file in job directory
         job_dir = OUTPUT_DIR / job_id
@@ -3883,14 +3999,13 @@ def extract_lyrics(job_id):
             job_dir = library_path
         else:
             # Regular job - check ownership
-            with jobs_lock:
-                job = jobs_storage.get(job_id)
-                if not job:
-                    return jsonify({'error': 'Job not found'}), 404
-                
-                job_owner = job.get('user')  # Job stores username as 'user'
-                if not is_admin and job_owner != current_user:
-                    return jsonify({'error': 'You do not have permission to extract lyrics for this job'}), 403
+            job = jobs_storage.get(job_id)
+            if not job:
+                return jsonify({'error': 'Job not found'}), 404
+            
+            job_owner = job.get('user')  # Job stores username as 'user'
+            if not is_admin and job_owner != current_user:
+                return jsonify({'error': 'You do not have permission to extract lyrics for this job'}), 403
             
             # Use user-specific output directory
             user_output_dir = get_user_output_dir(job_owner)
@@ -4004,20 +4119,19 @@ def get_lyrics(job_id):
         if job_id not in jobs_storage:
             scan_existing_outputs(current_user)
         
-        with jobs_lock:
-            job = jobs_storage.get(job_id)
-            if not job:
-                # Try scanning all for admin
-                if is_admin:
-                    scan_existing_outputs()
-                    job = jobs_storage.get(job_id)
-                
-                if not job:
-                    return jsonify({'error': 'Job not found', 'available': False}), 404
+        job = jobs_storage.get(job_id)
+        if not job:
+            # Try scanning all for admin
+            if is_admin:
+                scan_existing_outputs()
+                job = jobs_storage.get(job_id)
             
-            job_owner = job.get('user')  # Job stores username as 'user'
-            if not is_admin and job_owner != current_user:
-                return jsonify({'error': 'Permission denied', 'available': False}), 403
+            if not job:
+                return jsonify({'error': 'Job not found', 'available': False}), 404
+        
+        job_owner = job.get('user')  # Job stores username as 'user'
+        if not is_admin and job_owner != current_user:
+            return jsonify({'error': 'Permission denied', 'available': False}), 403
         
         # Use user-specific output directory
         user_output_dir = get_user_output_dir(job_owner)
@@ -4054,14 +4168,13 @@ def get_lyrics_lrc(job_id):
         current_user = session.get('user_id')
         is_admin = session.get('user_role') == 'admin'
         
-        with jobs_lock:
-            job = jobs_storage.get(job_id)
-            if not job:
-                return jsonify({'error': 'Job not found'}), 404
-            
-            job_owner = job.get('user')  # Job stores username as 'user'
-            if not is_admin and job_owner != current_user:
-                return jsonify({'error': 'Permission denied'}), 403
+        job = jobs_storage.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        job_owner = job.get('user')  # Job stores username as 'user'
+        if not is_admin and job_owner != current_user:
+            return jsonify({'error': 'Permission denied'}), 403
         
         # Use user-specific output directory
         user_output_dir = get_user_output_dir(job_owner)
@@ -4093,14 +4206,13 @@ def save_lyrics(job_id):
         current_user = session.get('user_id')
         is_admin = session.get('user_role') == 'admin'
         
-        with jobs_lock:
-            job = jobs_storage.get(job_id)
-            if not job:
-                return jsonify({'error': 'Job not found'}), 404
-            
-            job_owner = job.get('user')
-            if not is_admin and job_owner != current_user:
-                return jsonify({'error': 'Permission denied'}), 403
+        job = jobs_storage.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        job_owner = job.get('user')
+        if not is_admin and job_owner != current_user:
+            return jsonify({'error': 'Permission denied'}), 403
         
         # Get the lyrics data from request
         data = request.get_json()
@@ -4219,20 +4331,19 @@ def karaoke_page(job_id):
             if job_id not in jobs_storage:
                 scan_existing_outputs(current_user)
             
-            with jobs_lock:
-                job = jobs_storage.get(job_id)
-                if not job:
-                    # Try one more scan of all outputs for admin
-                    if is_admin:
-                        scan_existing_outputs()
-                        job = jobs_storage.get(job_id)
-                    
-                    if not job:
-                        return "Job not found", 404
+            job = jobs_storage.get(job_id)
+            if not job:
+                # Try one more scan of all outputs for admin
+                if is_admin:
+                    scan_existing_outputs()
+                    job = jobs_storage.get(job_id)
                 
-                job_owner = job.get('user')
-                if not is_admin and job_owner != current_user:
-                    return "Permission denied", 403
+                if not job:
+                    return "Job not found", 404
+            
+            job_owner = job.get('user')
+            if not is_admin and job_owner != current_user:
+                return "Permission denied", 403
             
             # Get job details for display - try multiple fields for name
             job_name = job.get('original_name') or job.get('display_name') or job.get('filename', 'Unknown Track')
@@ -4277,8 +4388,7 @@ def serve_video(job_id):
         user_role = session.get('user_role')
         
         # Get job info
-        with jobs_lock:
-            job = jobs_storage.get(job_id)
+        job = jobs_storage.get(job_id)
         
         if job and user_role != 'admin' and job.get('user') != username:
             return jsonify({'error': 'Access denied'}), 403
@@ -4313,6 +4423,11 @@ def serve_video(job_id):
 
 
 if __name__ == '__main__':
+    # Jobs that were running when the server last stopped will never finish
+    interrupted = mark_interrupted_jobs()
+    if interrupted:
+        logger.info(f"Marked {interrupted} interrupted jobs as failed")
+    
     # Scan for existing outputs on startup
     scan_existing_outputs()
     
@@ -0,0 +1,536 @@
+"""
+Harmonix Database
+SQLite storage for users, contact submissions, activity history and jobs
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import sqlite3
+import itertools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Base data directory (shared with the legacy JSON stores)
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+DB_FILE = DATA_DIR / "harmonix.db"
+LOCK_FILE = DATA_DIR / "harmonix.db.lock"
+
+# Legacy JSON stores, migrated into SQLite on first boot
+USERS_FILE = DATA_DIR / "users.json"
+CONTACTS_FILE = DATA_DIR / "contacts.json"
+ACTIVITY_FILE = DATA_DIR / "activities.json"
+
+# ==================== SCHEMA ====================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username      TEXT PRIMARY KEY,
+    email         TEXT UNIQUE,
+    password_hash TEXT NOT NULL DEFAULT '',
+    salt          TEXT NOT NULL DEFAULT '',
+    role          TEXT NOT NULL DEFAULT 'user',
+    name          TEXT,
+    created_at    TEXT,
+    last_login    TEXT,
+    is_active     INTEGER NOT NULL DEFAULT 1,
+    plan          TEXT NOT NULL DEFAULT 'free',
+    usage         TEXT NOT NULL DEFAULT '{}',
+    extra         TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id          TEXT PRIMARY KEY,
+    name        TEXT,
+    email       TEXT,
+    subject     TEXT,
+    message     TEXT,
+    category    TEXT,
+    created_at  TEXT,
+    status      TEXT NOT NULL DEFAULT 'new',
+    replied     INTEGER NOT NULL DEFAULT 0,
+    reply       TEXT,
+    reply_at    TEXT,
+    extra       TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS activities (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    username    TEXT NOT NULL,
+    type        TEXT NOT NULL,
+    description TEXT,
+    timestamp   TEXT NOT NULL,
+    metadata    TEXT NOT NULL DEFAULT '{}',
+    ts          INTEGER  -- Unix epoch of timestamp, for cheap age math
+);
+
+CREATE INDEX IF NOT EXISTS idx_activities_user ON activities (username, id DESC);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    user        TEXT,
+    status      TEXT NOT NULL DEFAULT 'new',
+    created_at  TEXT,
+    updated_at  INTEGER,
+    extra       TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at DESC);
+"""
+
+# Columns added after a table was first released: table -> (column, type)
+ADDED_COLUMNS = (
+    ("activities", "ts", "INTEGER"),
+)
+
+# Column layout per table. Keys not listed here are kept in the `extra` JSON
+# column so records can carry free-form fields (avatar, bio, ...).
+USER_COLUMNS = (
+    "username", "email", "password_hash", "salt", "role", "name",
+    "created_at", "last_login", "is_active", "plan", "usage",
+)
+CONTACT_COLUMNS = (
+    "id", "name", "email", "subject", "message", "category",
+    "created_at", "status", "replied", "reply", "reply_at",
+)
+
+JSON_COLUMNS = frozenset({"usage", "metadata"})
+BOOL_COLUMNS = frozenset({"is_active", "replied"})
+
+# Values used when a record omits a NOT NULL column
+COLUMN_DEFAULTS = {
+    "password_hash": "",
+    "salt": "",
+    "role": "user",
+    "is_active": True,
+    "plan": "free",
+    "status": "new",
+    "replied": False,
+}
+
+# ==================== CONNECTIONS ====================
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _open_connection() -> sqlite3.Connection:
+    """Open a tuned autocommit connection to the database"""
+    conn = sqlite3.connect(str(DB_FILE), isolation_level=None, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Get this thread's database connection
+
+    The schema is created and legacy JSON stores are migrated the first
+    time any thread connects.
+    """
+    global _initialized
+
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        conn = _open_connection()
+        _local.conn = conn
+
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(SCHEMA)
+                with process_lock():
+                    upgrade_schema(conn)
+                    migrate_json_stores(conn)
+                    # After the import, so legacy users whose emails differ
+                    # only in case are kept rather than dropped
+                    create_email_index(conn)
+                    backfill_epochs(conn)
+                _initialized = True
+
+    return conn
+
+
+@contextmanager
+def process_lock() -> Iterator[None]:
+    """
+    Hold an exclusive lock shared by every worker process
+    
+    SQLite serializes writes on its own; this guards multi-step work outside
+    the database, such as importing and retiring the legacy JSON stores, so
+    only one gunicorn worker performs it.
+    """
+    with open(LOCK_FILE, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run a read-modify-write cycle in a single IMMEDIATE transaction
+
+    The write lock is taken up front so concurrent workers serialize instead
+    of failing on lock upgrade.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def backup_database(dest: Path) -> Path:
+    """Write a consistent snapshot of the database to dest"""
+    dest_conn = sqlite3.connect(str(dest))
+    try:
+        get_connection().backup(dest_conn)
+    finally:
+        dest_conn.close()
+    return dest
+
+
+# ==================== WRITE BATCHING ====================
+
+
+class WriteBatcher:
+    """
+    Coalesce fire-and-forget writes into one transaction per window
+    
+    Writes that callers don't need to observe immediately (last-login stamps,
+    activity log entries) are queued and applied by a background thread in a
+    single IMMEDIATE transaction, with consecutive identical statements sent
+    through executemany. Writes submitted with the same key within a window
+    collapse to the most recent one.
+    
+    Readers of batched tables call flush() first; flush() is a no-op when
+    nothing is pending.
+    """
+    
+    def __init__(self, window: float = 0.05):
+        """
+        Args:
+            window: Seconds to accumulate writes before applying them
+        """
+        self.window = window
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, sql: str, params: Sequence[Any], key: Optional[Hashable] = None):
+        """
+        Queue a write statement
+        
+        Args:
+            sql: Parameterized SQL statement
+            params: Statement parameters
+            key: Optional coalescing key; a later write with the same
+                statement and key replaces an earlier pending one
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put((sql, tuple(params), key))
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Block until every write submitted so far has been applied"""
+        if self._thread is None or self._queue.unfinished_tasks == 0:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+    
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="harmonix-db-writer", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush, 5.0)
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            # A flush request ends the window early
+            while not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._apply([item for item in batch if not isinstance(item, threading.Event)])
+            except Exception as e:
+                logger.error(f"Batched database write failed: {e}")
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    self._queue.task_done()
+    
+    def _apply(self, writes: list):
+        if not writes:
+            return
+        
+        # Keyed writes move to their latest position so they still run after
+        # anything submitted before them
+        ops: Dict[Hashable, tuple] = {}
+        for n, (sql, params, key) in enumerate(writes):
+            op_key = (sql, key) if key is not None else n
+            ops.pop(op_key, None)
+            ops[op_key] = (sql, params)
+        
+        conn = get_connection()
+        with transaction(conn):
+            for sql, group in itertools.groupby(ops.values(), key=lambda op: op[0]):
+                conn.executemany(sql, [params for _, params in group])
+
+
+batcher = WriteBatcher()
+
+
+# ==================== ROW ENCODING ====================
+
+
+def dumps(value: Any) -> str:
+    """Serialize a JSON column value, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles those
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def loads(value: Optional[str]) -> Any:
+    """Deserialize a JSON column value"""
+    if not value:
+        return {}
+    return orjson.loads(value) if ORJSON_AVAILABLE else json.loads(value)
+
+
+def encode_record(record: Dict[str, Any], columns: Iterable[str]) -> Dict[str, Any]:
+    """
+    Map a record dict onto table columns
+
+    Args:
+        record: Record as used by the application
+        columns: Table columns (excluding `extra`)
+
+    Returns:
+        Column -> SQL value mapping, with unknown keys packed into `extra`
+    """
+    row = {}
+    for column in columns:
+        value = record.get(column)
+        if value is None:
+            value = COLUMN_DEFAULTS.get(column)
+        if column in JSON_COLUMNS:
+            value = dumps(value or {})
+        elif column in BOOL_COLUMNS:
+            value = int(bool(value))
+        row[column] = value
+
+    row["extra"] = dumps({k: v for k, v in record.items() if k not in row})
+    return row
+
+
+def decode_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a database row back into an application record dict"""
+    record = dict(row)
+    for column in JSON_COLUMNS & record.keys():
+        record[column] = loads(record[column])
+    for column in BOOL_COLUMNS & record.keys():
+        record[column] = bool(record[column])
+    extra = record.pop("extra", None)
+    if extra:
+        record.update(loads(extra))
+    return record
+
+
+def insert(conn: sqlite3.Connection, table: str, row: Dict[str, Any], or_ignore: bool = False):
+    """Insert a row, optionally skipping it if it violates a uniqueness constraint"""
+    columns = list(row)
+    verb = "INSERT OR IGNORE" if or_ignore else "INSERT"
+    conn.execute(
+        f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [row[c] for c in columns],
+    )
+
+
+def upsert(conn: sqlite3.Connection, table: str, key: str, row: Dict[str, Any]):
+    """Insert a row or update it in place when the key already exists"""
+    columns = list(row)
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+    conn.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+        [row[c] for c in columns],
+    )
+
+
+# ==================== SCHEMA UPGRADES ====================
+
+
+def upgrade_schema(conn: sqlite3.Connection):
+    """Add columns introduced after a database was created"""
+    for table, column, sql_type in ADDED_COLUMNS:
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+            logger.info(f"Added column {table}.{column}")
+
+
+def create_email_index(conn: sqlite3.Connection):
+    """
+    Make user emails unique regardless of case
+    
+    Logins and lookups match emails case-insensitively, so uniqueness must
+    too. Created here rather than in SCHEMA so a database that already
+    holds case-variant duplicates still opens, with a plain index instead.
+    """
+    try:
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_unique "
+            "ON users (email COLLATE NOCASE)"
+        )
+    except sqlite3.IntegrityError:
+        logger.error("Some user emails differ only in case; case-insensitive "
+                     "email uniqueness is not enforced until they are merged")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE)"
+        )
+    else:
+        conn.execute("DROP INDEX IF EXISTS idx_users_email_nocase")
+
+
+def backfill_epochs(conn: sqlite3.Connection):
+    """Fill activities.ts for rows imported or written before the column existed"""
+    # Stored timestamps are naive local time; 'utc' converts them to UTC
+    conn.execute(
+        "UPDATE activities SET ts = CAST(strftime('%s', timestamp, 'utc') AS INTEGER) "
+        "WHERE ts IS NULL"
+    )
+
+
+# ==================== JSON MIGRATION ====================
+
+
+def _load_legacy(path: Path) -> Any:
+    """Read a legacy JSON store, returning None if missing or unreadable"""
+    if not path.exists():
+        return None
+    try:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(path.read_bytes())
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read legacy store {path}: {e}")
+        return None
+
+
+def _retire_legacy(path: Path):
+    """Rename a migrated JSON store so it is kept as a backup but not re-imported"""
+    os.replace(path, path.with_name(path.name + ".migrated"))
+
+
+def migrate_json_stores(conn: sqlite3.Connection):
+    """
+    One-shot import of users.json, contacts.json and activities.json
+    
+    Callers hold process_lock() so concurrent workers don't import the same
+    activity history twice.
+    """
+    users = _load_legacy(USERS_FILE)
+    contacts = _load_legacy(CONTACTS_FILE)
+    activities = _load_legacy(ACTIVITY_FILE)
+
+    if users is None and contacts is None and activities is None:
+        return
+
+    skipped_users = []
+    with transaction(conn):
+        if isinstance(users, dict):
+            for username, data in users.items():
+                try:
+                    insert(conn, "users", encode_record({**data, "username": username}, USER_COLUMNS))
+                except sqlite3.IntegrityError:
+                    # A row already holding this username was imported by an
+                    # earlier run; anything else is an email clash
+                    if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+                        continue
+                    skipped_users.append(username)
+                    logger.error(
+                        f"Legacy user {username!r} not migrated: email "
+                        f"{data.get('email')!r} is already registered"
+                    )
+
+        if isinstance(contacts, list):
+            for contact in contacts:
+                insert(conn, "contacts", encode_record(contact, CONTACT_COLUMNS), or_ignore=True)
+
+        if isinstance(activities, dict):
+            for username, entries in activities.items():
+                # Stored most-recent-first; insert oldest first so ids follow time
+                conn.executemany(
+                    "INSERT INTO activities (username, type, description, timestamp, metadata) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (username, a.get("type", ""), a.get("description"),
+                         a.get("timestamp", ""), dumps(a.get("metadata") or {}))
+                        for a in reversed(entries)
+                    ],
+                )
+
+    for path, data in ((USERS_FILE, users), (CONTACTS_FILE, contacts), (ACTIVITY_FILE, activities)):
+        if path == USERS_FILE and skipped_users:
+            # Keep the store in place until the clashing users are resolved
+            logger.error(f"Kept {path.name}: {len(skipped_users)} users could not be migrated")
+        elif data is not None:
+            _retire_legacy(path)
+            logger.info(f"Migrated {path.name} into {DB_FILE.name}")
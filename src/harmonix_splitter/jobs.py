@@ -0,0 +1,229 @@
+"""
+Harmonix Job Store
+Dashboard job records, cached in memory and persisted to SQLite
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from harmonix_splitter import db
+
+logger = logging.getLogger(__name__)
+
+# Column layout of the jobs table; other fields are kept in `extra`
+JOB_COLUMNS = ("job_id", "user", "status", "created_at", "updated_at")
+
+FINISHED_STATUSES = frozenset({'completed', 'failed', 'cancelled'})
+
+UPSERT_JOB = (
+    f"INSERT INTO jobs ({', '.join(JOB_COLUMNS)}, extra) "
+    f"VALUES ({', '.join('?' for _ in JOB_COLUMNS)}, ?) "
+    "ON CONFLICT(job_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in (*JOB_COLUMNS[1:], "extra"))
+)
+DELETE_JOB = "DELETE FROM jobs WHERE job_id = ?"
+
+
+# ==================== PERSISTENCE ====================
+
+
+def save_job(job: Dict[str, Any]):
+    """
+    Queue a snapshot of a job record for writing
+
+    Writes go through the batcher keyed by job id, so a burst of progress
+    updates to one job lands as a single row write.
+    """
+    row = db.encode_record({**job, "updated_at": int(time.time())}, JOB_COLUMNS)
+    db.batcher.submit(UPSERT_JOB, [row[c] for c in (*JOB_COLUMNS, "extra")], key=job["job_id"])
+
+
+def delete_job(job_id: str):
+    """Queue removal of a job record"""
+    db.batcher.submit(DELETE_JOB, [job_id], key=job_id)
+
+
+def _decode_job(row) -> Dict[str, Any]:
+    job = db.decode_row(row)
+    job.pop("updated_at", None)
+    return job
+
+
+def load_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get a stored job record, or None if there is none"""
+    db.batcher.flush()
+    row = db.get_connection().execute(
+        "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    return _decode_job(row) if row else None
+
+
+def load_recent_jobs(user: Optional[str] = None, limit: int = 50,
+                     all_users: bool = False) -> List[Dict[str, Any]]:
+    """
+    Get the most recently created stored jobs
+
+    Args:
+        user: Owner to filter on (None = anonymous jobs)
+        limit: Maximum number of jobs to return
+        all_users: Ignore user and return jobs of every owner
+    """
+    db.batcher.flush()
+    conn = db.get_connection()
+    if all_users:
+        rows = conn.execute(
+            "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        )
+    else:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE user IS ? ORDER BY created_at DESC LIMIT ?",
+            (user, limit),
+        )
+    return [_decode_job(row) for row in rows]
+
+
+def mark_interrupted_jobs() -> int:
+    """
+    Fail stored jobs that were still running when the server stopped
+
+    Only call this from a single-process server at startup; with several
+    workers, another worker may still be running them.
+
+    Returns:
+        Number of jobs marked as failed
+    """
+    db.batcher.flush()
+    conn = db.get_connection()
+    placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+    rows = conn.execute(
+        f"SELECT * FROM jobs WHERE status NOT IN ({placeholders})", tuple(FINISHED_STATUSES)
+    ).fetchall()
+    for row in rows:
+        job = _decode_job(row)
+        job.update(status='failed', stage='Interrupted', error='Interrupted by a server restart')
+        save_job(job)
+    db.batcher.flush()
+    return len(rows)
+
+
+# ==================== IN-MEMORY CACHE ====================
+
+
+class JobRecord(dict):
+    """Job dict that queues a database write whenever a field is set"""
+
+    __slots__ = ("persist",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.persist = False
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self.persist:
+            save_job(self)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        if self.persist:
+            save_job(self)
+
+
+class JobStorage(OrderedDict):
+    """
+    Job records, backed by the jobs table and bounded in memory
+
+    Records set here and fields set on them are written through to SQLite,
+    so jobs survive restarts and every worker process can read them. get()
+    falls back to the database for jobs not held in memory, and re-reads
+    running jobs owned by another process so their progress stays current.
+
+    Memory holds at most max_size records. When full, the least recently
+    used finished jobs are dropped; queued and running jobs never are.
+
+    The store is safe to use from several threads. Its lock only covers the
+    in-memory bookkeeping; database reads happen outside it, so status
+    polls don't queue behind each other or behind job updates.
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+        self._local: set = set()  # Jobs created by this process
+        self._lock = threading.RLock()
+
+    def _is_current(self, job_id, job) -> bool:
+        """Whether a held record needs no refresh from the database"""
+        return job_id in self._local or job.get('status') in FINISHED_STATUSES
+
+    def get(self, job_id, default=None):
+        with self._lock:
+            job = super().get(job_id)
+            if job is not None and self._is_current(job_id, job):
+                self.move_to_end(job_id)
+                return job
+
+        stored = load_job(job_id)
+
+        with self._lock:
+            job = super().get(job_id)
+            if stored is not None and (job is None or not self._is_current(job_id, job)):
+                return self._insert(job_id, JobRecord(stored))
+            if job is None:
+                return default
+            self.move_to_end(job_id)
+            return job
+
+    def __setitem__(self, job_id, job):
+        record = job if isinstance(job, JobRecord) else JobRecord(job)
+        with self._lock:
+            self._local.add(job_id)
+            self._insert(job_id, record)
+        save_job(record)
+
+    def __delitem__(self, job_id):
+        with self._lock:
+            record = super().__getitem__(job_id)
+            super().__delitem__(job_id)
+            record.persist = False
+            self._local.discard(job_id)
+        delete_job(job_id)
+
+    def values(self) -> List[Dict[str, Any]]:
+        """Snapshot of the held records"""
+        with self._lock:
+            return list(super().values())
+
+    def refresh(self, user: Optional[str] = None, limit: int = 50, all_users: bool = False):
+        """Load recent stored jobs that another process created or updated"""
+        stored_jobs = load_recent_jobs(user, limit, all_users)
+        with self._lock:
+            for job in stored_jobs:
+                job_id = job['job_id']
+                held = super().get(job_id)
+                if held is None or not self._is_current(job_id, held):
+                    self._insert(job_id, JobRecord(job))
+
+    def _insert(self, job_id, record: JobRecord) -> JobRecord:
+        """Hold a record in memory, dropping old finished jobs when full"""
+        held = super().get(job_id)
+        if held is not None and held is not record:
+            held.persist = False  # Replaced; stop writing the stale copy
+        record.persist = True
+        super().__setitem__(job_id, record)
+        self.move_to_end(job_id)
+
+        excess = len(self) - self.max_size
+        if excess > 0:
+            for old_id, old_job in list(self.items()):
+                if old_id != job_id and old_job.get('status') in FINISHED_STATUSES:
+                    # Only forgotten here; the stored record is kept
+                    super().__delitem__(old_id)
+                    self._local.discard(old_id)
+                    excess -= 1
+                    if not excess:
+                        break
+        return record
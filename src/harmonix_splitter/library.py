@@ -77,7 +77,7 @@ def save_user_links(username: str, links_data: Dict[str, Any]) -> bool:
     try:
         links_data["updated_at"] = datetime.now().isoformat()
         with open(links_file, 'w', encoding='utf-8') as f:
-            json.dump(links_data, f, ensure_ascii=False, indent=2)
+            json.dump(links_data, f, ensure_ascii=False, separators=(',', ':'))
         return True
     except Exception as e:
         logger.error(f"Failed to save user links for {username}: {e}")
@@ -253,7 +253,7 @@ def update_library_usage(youtube_id: str, increment: bool = True) -> int:
         metadata["last_usage_update"] = datetime.now().isoformat()
         
         with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+            json.dump(metadata, f, ensure_ascii=False, separators=(',', ':'))
         
         return new_count
         
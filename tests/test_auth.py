@@ -0,0 +1,240 @@
+"""
+Tests for Harmonix authentication storage
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+from harmonix_splitter import auth, db
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the database and legacy JSON stores at a temporary directory"""
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(db, "DB_FILE", tmp_path / "harmonix.db")
+    monkeypatch.setattr(db, "LOCK_FILE", tmp_path / "harmonix.db.lock")
+    monkeypatch.setattr(db, "USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr(db, "CONTACTS_FILE", tmp_path / "contacts.json")
+    monkeypatch.setattr(db, "ACTIVITY_FILE", tmp_path / "activities.json")
+    monkeypatch.setattr(db, "_local", threading.local())
+    monkeypatch.setattr(db, "_initialized", False)
+    monkeypatch.setattr(auth, "_seeded", False)
+    monkeypatch.setattr(auth, "_user_cache", {})
+    monkeypatch.setattr(auth, "_verified_passwords", {})
+    monkeypatch.setattr(auth, "_inserts_since_trim", {})
+    yield tmp_path
+    db.batcher.flush()
+
+
+class TestUserStore:
+    """Test user storage operations"""
+
+    def test_default_admin_created(self, data_dir):
+        users = auth.load_users()
+        assert list(users) == ["admin"]
+        assert auth.authenticate_user("admin", "admin123")["role"] == "admin"
+
+    def test_create_and_authenticate_by_email(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret", "Bob")
+
+        user = auth.authenticate_user("bob@example.com", "secret")
+        assert user["username"] == "bob"
+        assert user["last_login"] is not None
+        assert auth.authenticate_user("bob", "wrong") is None
+
+    def test_duplicate_email_rejected(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        with pytest.raises(ValueError):
+            auth.create_user("bobby", "bob@example.com", "secret")
+        with pytest.raises(ValueError):
+            auth.create_user("bobby", "Bob@Example.com", "secret")
+
+    def test_case_variant_email_rejected_on_update(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        auth.create_user("carol", "carol@example.com", "secret")
+
+        assert auth.update_user("carol", {"email": "BOB@example.com"}) is None
+        assert auth.get_user("carol")["email"] == "carol@example.com"
+        with pytest.raises(sqlite3.IntegrityError):
+            db.get_connection().execute(
+                "INSERT INTO users (username, email) VALUES ('dan', 'Bob@Example.com')"
+            )
+
+    def test_email_lookup_ignores_case(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+
+        assert auth.get_user_by_email("BOB@example.com")["username"] == "bob"
+        assert auth.authenticate_user("Bob@Example.COM", "secret")["username"] == "bob"
+
+    def test_update_keeps_extra_fields(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        auth.update_user("bob", {"bio": "Drummer", "password_hash": "ignored"})
+
+        user = auth.get_user("bob")
+        assert user["bio"] == "Drummer"
+        assert user["password_hash"] != "ignored"
+
+    def test_all_users_omit_credentials(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        auth.update_user("bob", {"avatar": "/avatars/b.jpg"})
+
+        users = {u["id"]: u for u in auth.get_all_users()}
+        assert set(users) == {"admin", "bob"}
+        assert users["bob"]["avatar"] == "/avatars/b.jpg"
+        assert "password_hash" not in users["bob"] and "salt" not in users["bob"]
+
+    def test_cached_user_invalidated_on_update(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret", "Bob")
+        assert auth.get_user("bob")["name"] == "Bob"
+
+        auth.update_user("bob", {"name": "Robert"})
+        assert auth.get_user("bob")["name"] == "Robert"
+
+    def test_password_change_bypasses_verify_cache(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        assert auth.authenticate_user("bob", "secret") is not None
+
+        auth.change_password("bob", "secret", "new-secret")
+        assert auth.authenticate_user("bob", "secret") is None
+        assert auth.authenticate_user("bob", "new-secret") is not None
+
+    def test_legacy_hash_upgraded_on_login(self, data_dir):
+        import hashlib
+
+        auth.create_user("bob", "bob@example.com", "secret")
+        legacy = hashlib.pbkdf2_hmac("sha256", b"secret", b"oldsalt", 100000).hex()
+        conn = db.get_connection()
+        conn.execute("UPDATE users SET password_hash = ?, salt = ? WHERE username = 'bob'",
+                      (legacy, "oldsalt"))
+        auth._invalidate_user("bob")
+
+        assert auth.authenticate_user("bob", "secret") is not None
+        stored = conn.execute("SELECT password_hash FROM users WHERE username = 'bob'").fetchone()[0]
+        assert not auth.needs_rehash(stored)
+        assert auth.authenticate_user("bob", "secret") is not None
+
+    def test_increment_song_usage(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        auth.increment_song_usage("bob")
+        auth.increment_song_usage("bob")
+
+        limit = auth.check_usage_limit("bob")
+        assert limit["used"] == 2
+        assert limit["remaining"] == 1
+
+
+class TestAdminStats:
+    """Test admin dashboard aggregates"""
+
+    def test_counts(self, data_dir):
+        auth.create_user("bob", "bob@example.com", "secret")
+        auth.create_user("carol", "carol@example.com", "secret")
+        auth.upgrade_plan("carol", "creator")
+        auth.increment_song_usage("bob")
+        auth.add_contact_submission("Dan", "dan@example.com", "Hi", "Hello")
+
+        stats = auth.get_admin_stats()
+        assert stats["total_users"] == 3
+        assert stats["new_users_week"] == 3
+        assert stats["free_users"] == 1
+        assert stats["creator_users"] == 1
+        assert stats["studio_users"] == 1
+        assert stats["total_songs"] == 1
+        assert stats["pending_contacts"] == stats["total_contacts"] == 1
+        assert stats["monthly_revenue"] == 19 + 49
+
+
+class TestActivities:
+    """Test activity history"""
+
+    def test_most_recent_first_and_trimmed(self, data_dir):
+        for i in range(auth.MAX_ACTIVITIES_PER_USER + 5):
+            auth.log_activity("bob", "login", f"login {i}")
+
+        recent = auth.get_user_activities("bob", limit=2)
+        assert [a["description"] for a in recent] == ["login 104", "login 103"]
+        assert len(auth.load_activities()["bob"]) == auth.MAX_ACTIVITIES_PER_USER
+        assert len(auth.get_user_activities("bob", limit=500)) == auth.MAX_ACTIVITIES_PER_USER
+
+    def test_trim_runs_periodically(self, data_dir):
+        total = auth.MAX_ACTIVITIES_PER_USER + auth.ACTIVITY_TRIM_INTERVAL
+        for i in range(total):
+            auth.log_activity("bob", "login", f"login {i}")
+        db.batcher.flush()
+
+        stored = db.get_connection().execute(
+            "SELECT COUNT(*) FROM activities WHERE username = 'bob'"
+        ).fetchone()[0]
+        assert stored == auth.MAX_ACTIVITIES_PER_USER
+
+    def test_activity_epoch(self, data_dir):
+        auth.log_activity("bob", "login", "login")
+
+        activity = auth.get_user_activities("bob")[0]
+        assert isinstance(activity["ts"], int)
+        assert auth.format_time_ago(activity["ts"]) == "Just now"
+        assert auth.format_time_ago("not a date") == "Unknown"
+
+
+class TestJsonMigration:
+    """Test one-shot import of the legacy JSON stores"""
+
+    def test_migrates_users_and_activities(self, data_dir):
+        pw_hash, salt = auth.hash_password("secret")
+        (data_dir / "users.json").write_text(json.dumps({
+            "carol": {"email": "carol@example.com", "password_hash": pw_hash,
+                      "salt": salt, "plan": "creator", "avatar": "/avatars/c.jpg"}
+        }))
+        (data_dir / "activities.json").write_text(json.dumps({
+            "carol": [
+                {"type": "login", "description": "newest", "timestamp": "2026-01-02T00:00:00"},
+                {"type": "login", "description": "oldest", "timestamp": "2026-01-01T00:00:00"},
+            ]
+        }))
+
+        assert auth.get_user("carol")["avatar"] == "/avatars/c.jpg"
+        assert auth.authenticate_user("carol", "secret") is not None
+        assert [a["description"] for a in auth.get_user_activities("carol")] == ["newest", "oldest"]
+        assert (data_dir / "users.json.migrated").exists()
+        assert not (data_dir / "users.json").exists()
+
+    def test_case_variant_emails_not_dropped(self, data_dir):
+        (data_dir / "users.json").write_text(json.dumps({
+            "a": {"email": "A@x.com"},
+            "b": {"email": "a@x.com"},
+            "c": {"email": "a@x.com"},
+        }))
+
+        usernames = [u["id"] for u in auth.get_all_users()]
+        assert sorted(usernames) == ["a", "b"]
+        # c clashes exactly with b, so the store is kept for a manual merge
+        assert (data_dir / "users.json").exists()
+        assert not (data_dir / "users.json.migrated").exists()
+
+        # A later start skips the users it already imported
+        db._initialized = False
+        assert sorted(u["id"] for u in auth.get_all_users()) == ["a", "b"]
+
+    def test_epochs_backfilled_for_existing_database(self, data_dir):
+        import sqlite3
+
+        conn = sqlite3.connect(data_dir / "harmonix.db")
+        conn.execute(
+            "CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, "
+            "type TEXT NOT NULL, description TEXT, timestamp TEXT NOT NULL, "
+            "metadata TEXT NOT NULL DEFAULT '{}')"
+        )
+        conn.execute(
+            "INSERT INTO activities (username, type, description, timestamp) "
+            "VALUES ('carol', 'login', 'old', '2026-01-01T12:00:00')"
+        )
+        conn.commit()
+        conn.close()
+
+        activity = auth.get_user_activities("carol")[0]
+        assert activity["ts"] == int(datetime(2026, 1, 1, 12).timestamp())
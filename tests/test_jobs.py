@@ -0,0 +1,148 @@
+"""
+Tests for Harmonix job storage
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from harmonix_splitter import db, jobs
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the database at a temporary directory"""
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(db, "DB_FILE", tmp_path / "harmonix.db")
+    monkeypatch.setattr(db, "LOCK_FILE", tmp_path / "harmonix.db.lock")
+    monkeypatch.setattr(db, "USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr(db, "CONTACTS_FILE", tmp_path / "contacts.json")
+    monkeypatch.setattr(db, "ACTIVITY_FILE", tmp_path / "activities.json")
+    monkeypatch.setattr(db, "_local", threading.local())
+    monkeypatch.setattr(db, "_initialized", False)
+    yield tmp_path
+    db.batcher.flush()
+
+
+def _job(job_id, status="queued", user="bob"):
+    return {"job_id": job_id, "status": status, "progress": 0, "user": user,
+            "created_at": datetime.now().isoformat()}
+
+
+class TestJobStore:
+    """Test persisted dashboard job records"""
+
+    def test_records_survive_restart(self, data_dir):
+        store = jobs.JobStorage(10)
+        store["j1"] = _job("j1")
+        store["j1"]["progress"] = 50
+        store["j1"].update({"status": "completed", "stems": {"vocals": "/download/j1/vocals"}})
+
+        job = jobs.JobStorage(10).get("j1")
+        assert job["status"] == "completed"
+        assert job["progress"] == 50
+        assert job["stems"] == {"vocals": "/download/j1/vocals"}
+
+    def test_running_job_of_other_process_reread(self, data_dir):
+        worker, other = jobs.JobStorage(10), jobs.JobStorage(10)
+        worker["j1"] = _job("j1", status="processing")
+        assert other.get("j1")["progress"] == 0
+
+        worker["j1"]["progress"] = 40
+        assert other.get("j1")["progress"] == 40
+        assert other.get("missing") is None
+
+    def test_concurrent_polls_and_inserts(self, data_dir):
+        worker, poller = jobs.JobStorage(8), jobs.JobStorage(8)
+        worker["j0"] = _job("j0", status="processing")
+        errors = []
+
+        def poll():
+            try:
+                for _ in range(200):
+                    assert poller.get("j0")["status"] == "processing"
+                    poller.values()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=poll) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(1, 50):
+            poller[f"j{i}"] = _job(f"j{i}", status="completed")
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len(poller) <= 8
+
+    def test_delete_and_refresh(self, data_dir):
+        store = jobs.JobStorage(10)
+        store["j1"] = _job("j1", status="completed")
+        store["j2"] = _job("j2", status="completed", user="carol")
+        del store["j1"]
+
+        fresh = jobs.JobStorage(10)
+        fresh.refresh("bob")
+        assert list(fresh) == []
+        fresh.refresh(all_users=True)
+        assert list(fresh) == ["j2"]
+
+
+class TestEviction:
+    """Test the in-memory bound of the job store"""
+
+    def test_only_finished_jobs_leave_memory(self, data_dir):
+        store = jobs.JobStorage(2)
+        store["done"] = _job("done", status="completed")
+        store["running"] = _job("running", status="processing")
+        store["queued"] = _job("queued")
+        store["queued2"] = _job("queued2")
+
+        assert list(store) == ["running", "queued", "queued2"]
+        assert store.get("done")["status"] == "completed"
+
+    def test_least_recently_used_finished_job_dropped(self, data_dir):
+        store = jobs.JobStorage(3)
+        for job_id in ("a", "b", "c"):
+            store[job_id] = _job(job_id, status="completed")
+        store.get("a")
+
+        store["d"] = _job("d", status="failed")
+        assert list(store) == ["c", "a", "d"]
+
+    def test_running_jobs_kept_over_limit(self, data_dir):
+        store = jobs.JobStorage(1)
+        for job_id in ("a", "b", "c"):
+            store[job_id] = _job(job_id, status="processing")
+        assert list(store) == ["a", "b", "c"]
+
+        store["b"]["status"] = "completed"
+        store["d"] = _job("d", status="downloading")
+        assert list(store) == ["a", "c", "d"]
+        assert store.get("b")["status"] == "completed"
+
+
+class TestInterruptedJobs:
+    """Test recovery of jobs left running by a stopped server"""
+
+    def test_mark_interrupted_jobs(self, data_dir):
+        store = jobs.JobStorage(10)
+        store["queued"] = _job("queued")
+        store["running"] = _job("running", status="processing")
+        store["done"] = _job("done", status="completed")
+        store["cancelled"] = _job("cancelled", status="cancelled")
+
+        assert jobs.mark_interrupted_jobs() == 2
+        fresh = jobs.JobStorage(10)
+        for job_id in ("queued", "running"):
+            job = fresh.get(job_id)
+            assert job["status"] == "failed"
+            assert job["stage"] == "Interrupted"
+            assert job["error"] == "Interrupted by a server restart"
+        assert fresh.get("done")["status"] == "completed"
+        assert fresh.get("cancelled")["status"] == "cancelled"
+
+    def test_nothing_to_mark(self, data_dir):
+        assert jobs.mark_interrupted_jobs() == 0
@@ -0,0 +1,91 @@
+"""
+Tests for Harmonix lyrics extraction
+"""
+
+import json
+
+import pytest
+
+from harmonix_splitter.audio.lyrics import LyricLine, LyricsResult, _WhisperCppBackend, _group_words
+
+
+def _word(text, start, end):
+    return {'word': text, 'start': start, 'end': end, 'probability': 1.0}
+
+
+class TestQuantizedBackends:
+    """Test the quantized Whisper backend helpers"""
+
+    def test_ggml_model_names(self):
+        assert _WhisperCppBackend.model_name('small', 'int4') == 'small-q5_1'
+        assert _WhisperCppBackend.model_name('medium', 'int4') == 'medium-q5_0'
+        assert _WhisperCppBackend.model_name('large-v2', 'int8') == 'large-v2-q8_0'
+
+    def test_unpublished_ggml_model_rejected(self):
+        with pytest.raises(ValueError, match="large-v3"):
+            _WhisperCppBackend.model_name('large-v3', 'int8')
+
+    def test_words_grouped_into_lines(self):
+        words = [
+            _word(' Hello', 0.0, 0.4), _word(' world.', 0.4, 0.9),
+            _word(' Sing', 1.0, 1.3), _word(' along', 1.3, 1.8),
+            _word(' again', 4.0, 4.5),
+        ]
+
+        segments = _group_words(words)
+        assert [seg['text'] for seg in segments] == [' Hello world.', ' Sing along', ' again']
+        assert (segments[1]['start'], segments[1]['end']) == (1.0, 1.8)
+        assert segments[0]['words'] == words[:2]
+
+    def test_long_lines_split(self):
+        words = [_word(f' w{i}', i * 0.1, i * 0.1 + 0.05) for i in range(5)]
+        assert [len(seg['words']) for seg in _group_words(words, max_words=2)] == [2, 2, 1]
+
+
+class TestExportFormats:
+    """Test timed lyrics export"""
+
+    @pytest.fixture
+    def result(self):
+        lines = [
+            LyricLine("First line", 0.9995, 2.5),
+            LyricLine("Second line", 3599.9996, 3661.5,
+                      words=[{'word': ' Second', 'start': 3600.0, 'end': 3600.4}]),
+        ]
+        return LyricsResult("First line Second line", lines, "en", 0.9, 3661.5)
+
+    @pytest.mark.parametrize("seconds, expected", [
+        (0.0, "00:00:00,000"),
+        (0.9995, "00:00:01,000"),
+        (59.9996, "00:01:00,000"),
+        (3599.9996, "01:00:00,000"),
+        (3661.5, "01:01:01,500"),
+    ])
+    def test_srt_time(self, seconds, expected):
+        assert LyricsResult._format_srt_time(seconds) == expected
+
+    @pytest.mark.parametrize("seconds, expected", [
+        (0.0, "00:00.00"),
+        (0.996, "00:01.00"),
+        (59.996, "01:00.00"),
+        (3661.5, "61:01.50"),
+    ])
+    def test_lrc_time(self, seconds, expected):
+        assert LyricsResult._format_lrc_time(seconds) == expected
+
+    def test_srt_and_lrc(self, result):
+        assert result.to_srt() == (
+            "1\n00:00:01,000 --> 00:00:02,500\nFirst line\n\n"
+            "2\n01:00:00,000 --> 01:01:01,500\nSecond line\n"
+        )
+        assert result.to_lrc() == "[00:01.00]First line\n[60:00.00]Second line"
+
+    def test_render_matches_single_formats(self, result):
+        contents = result.render(['srt', 'lrc', 'json', 'txt', 'unknown'])
+
+        assert list(contents) == ['srt', 'lrc', 'json', 'txt']
+        assert contents['srt'] == result.to_srt()
+        assert contents['lrc'] == result.to_lrc()
+        assert contents['txt'] == result.text
+        assert json.loads(contents['json']) == result.to_dict()
+        assert contents == {fmt: result.render([fmt])[fmt] for fmt in contents}
@@ -0,0 +1,69 @@
+"""
+Tests for Harmonix Orchestrator
+"""
+
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from harmonix_splitter.core.orchestrator import ProcessingResult, create_orchestrator
+
+
+@pytest.fixture
+def orchestrator():
+    """Create a CPU orchestrator"""
+    orchestrator = create_orchestrator(auto_route=False)
+    orchestrator.settings.use_gpu = False
+    return orchestrator
+
+
+class TestBatchProcess:
+    """Test concurrent batch processing"""
+
+    def test_results_in_input_order(self, orchestrator, monkeypatch):
+        def process(audio_path, job_id, **kwargs):
+            # Earlier files finish last
+            time.sleep(0.05 * (3 - int(audio_path)))
+            if audio_path == "1":
+                raise RuntimeError("decode failed")
+            return ProcessingResult(job_id, "completed", {}, [], {}, 0.0, {})
+
+        monkeypatch.setattr(orchestrator, "process", process)
+        results = orchestrator.batch_process(["0", "1", "2"], "batch", max_workers=3)
+
+        assert [r.job_id for r in results] == ["batch_0", "batch_1", "batch_2"]
+        assert [r.status for r in results] == ["completed", "failed", "completed"]
+        assert results[1].metadata == {"error": "decode failed"}
+
+    def test_empty_batch(self, orchestrator):
+        assert orchestrator.batch_process([], "batch") == []
+
+    def test_cpu_separations_serialized(self, orchestrator, monkeypatch):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def separate(audio_path, output_dir, custom_name, device_lock=None):
+            with device_lock:
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+            return {}
+
+        separator = SimpleNamespace(device=SimpleNamespace(type="cpu"), separate=separate)
+        monkeypatch.setattr(orchestrator, "_get_separator", lambda plan: separator)
+
+        threads = [
+            threading.Thread(target=orchestrator._execute_separation, args=("a.wav", {}, "out"))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 1